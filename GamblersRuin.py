@@ -1,68 +1,138 @@
+from collections import namedtuple
 import numpy as np
 import matplotlib.pyplot as plt
+from random_streams import DEFAULT
+from plotting import show_or_save
 
 n_gam = 10000
 rounds = 1000
 start = 100
-
-outcomes = np.random.choice([-1, 1], size=(n_gam, rounds))
-starting_amounts = np.full((n_gam, 1), start)
-bankrolls = np.hstack((starting_amounts, outcomes))
-
-changes = np.cumsum(bankrolls, axis=1)
-is_ruined = changes <= 0
-ruin_mask = np.maximum.accumulate(is_ruined, axis=1)
-bankrolls[ruin_mask] = 0
-changes[ruin_mask] = 0
-
-
-#spaghetti plot of paths
-
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-subset_to_plot = changes[:100]
-no_rounds = np.arange(rounds + 1)
-
-for i in range(len(subset_to_plot)):
-    ax1.plot(no_rounds, subset_to_plot[i], alpha=0.2, color='gray')
-
-mean_path = np.mean(changes, axis=0)
-ax1.plot(no_rounds, mean_path, color='red', linestyle='--', linewidth=2.5, label='Mean Path')
-
-final_wealths = changes[:, -1]
-max_winner_idx = np.argmax(final_wealths)
-min_winner_idx = np.argmin(final_wealths)
-ax1.plot(no_rounds, changes[max_winner_idx], color='green', linewidth=1.5, label='Max Winner')
-ax1.plot(no_rounds, changes[min_winner_idx], color='blue', linewidth=1.5, label='Min Winner')
-
-ax1.set_title(f"Monte Carlo Simulation: {n_gam} Gamblers")
-ax1.set_xlabel("Rounds")
-ax1.set_ylabel("Wealth ($)")
-ax1.legend(loc='upper left')
-ax1.grid(True, alpha=0.3)
-
-#Histogram of final wealths
-ax2.hist(final_wealths, bins=66, color='skyblue', edgecolor='black')
-
-# Add vertical lines indicating the Mean and Median final wealth.
-mean_val = np.mean(final_wealths)
-median_val = np.median(final_wealths)
-
-ax2.axvline(mean_val, color='red', linestyle='dashed', linewidth=2, label=f'Mean: ${mean_val:.2f}')
-ax2.axvline(median_val, color='orange', linestyle='dashed', linewidth=2, label=f'Median: ${median_val:.2f}')
-
-ax2.set_title("Distribution of Final Wealth (Step 1000)")
-ax2.set_xlabel("Final Wealth ($)")
-ax2.set_ylabel("Frequency")
-ax2.legend()
-ax2.grid(True, alpha=0.3)
-
-plt.tight_layout()
-
-plt.show()
-
-#The final distribution is a Bell Curve (Normal Distribution) centered at $100.
-#This is due to the Central Limit Theorem.
-#The spread (Std Dev) is approx sqrt(1000) = 31.62
-#The Mean and Median are very close, indicating a symmetric distribution.
-#However, there are many players who have gone broke (final wealth = $0),
-#which skews the distribution slightly to the left.
+p_win = 0.5
+stake = 1
+
+# ruin_times[t] = gamblers ruined at round t; wealth_values / wealth_counts is
+# the final-wealth histogram (ruined gamblers count at 0); mean_path is the
+# mean wealth of all gamblers per round; paths is the kept sample (or None)
+RuinResult = namedtuple("RuinResult", ["ruin_probability", "stderr", "ruin_times", "wealth_values",
+                                       "wealth_counts", "mean_path", "paths"])
+
+def simulate_ruin(n_gam=n_gam, rounds=rounds, start=start, p_win=p_win, stake=stake,
+                  keep_paths=0, chunk_size=100_000, rng=None):
+    """
+    Plays n_gam gamblers for `rounds` rounds of +/- stake (win with
+    probability p_win), chunk_size gamblers at a time. A gambler is ruined
+    once wealth drops to 0 or below and takes no further part.
+    Only counts are kept, plus the full paths of the first keep_paths gamblers.
+    """
+    gen = (rng or DEFAULT).generator
+    ruin_times = np.zeros(rounds + 1, dtype=np.int64)
+    # Survivors end on start + stake * j, j in [-rounds, rounds]
+    final_counts = np.zeros(2 * rounds + 1, dtype=np.int64)
+    wealth_sums = np.zeros(rounds + 1, dtype=np.int64)
+    paths = np.zeros((keep_paths, rounds + 1), dtype=np.int32) if keep_paths else None
+
+    for first in range(0, n_gam, chunk_size):
+        # Only gamblers still playing are stored: their wealth and their index
+        wealth = np.full(min(chunk_size, n_gam - first), start, dtype=np.int32)
+        ids = np.arange(first, first + len(wealth), dtype=np.int32)
+        wealth_sums[0] += int(wealth.sum())
+        if keep_paths:
+            paths[first:first + len(wealth), 0] = start
+
+        for t in range(1, rounds + 1):
+            if not len(wealth):
+                break
+            wins = gen.random(len(wealth), dtype=np.float32) < p_win
+            wealth += np.where(wins, stake, -stake).astype(np.int32)
+
+            ruined = wealth <= 0
+            n_ruined = int(np.count_nonzero(ruined))
+            if n_ruined:
+                ruin_times[t] += n_ruined
+                wealth, ids = wealth[~ruined], ids[~ruined]
+            wealth_sums[t] += int(wealth.sum())
+
+            if keep_paths:
+                # ids stay sorted, so the kept gamblers are at the front
+                kept = np.searchsorted(ids, keep_paths)
+                paths[ids[:kept], t] = wealth[:kept]
+
+        final_counts += np.bincount((wealth - start) // stake + rounds, minlength=2 * rounds + 1)
+
+    n_ruined = int(ruin_times.sum())
+    values = start + stake * np.arange(-rounds, rounds + 1)
+    survived = final_counts > 0
+    wealth_values = np.concatenate([[0], values[survived]])
+    wealth_counts = np.concatenate([[n_ruined], final_counts[survived]])
+
+    q = n_ruined / n_gam
+    return RuinResult(q, np.sqrt(q * (1 - q) / n_gam), ruin_times, wealth_values,
+                      wealth_counts, wealth_sums / n_gam, paths)
+
+
+def plot_ruin(result, save_path=None):
+    """
+    Spaghetti plot of the kept paths (simulate_ruin with keep_paths > 0)
+    and the final-wealth histogram. Shown on screen, or written to
+    save_path (for headless runs).
+    """
+    n_gam = int(result.wealth_counts.sum())
+    rounds = len(result.mean_path) - 1
+
+    #spaghetti plot of paths
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+    subset_to_plot = result.paths
+    no_rounds = np.arange(rounds + 1)
+
+    mean_path = result.mean_path
+    ax1.plot(no_rounds, mean_path, color='red', linestyle='--', linewidth=2.5, label='Mean Path')
+
+    if subset_to_plot is not None:
+        for i in range(len(subset_to_plot)):
+            ax1.plot(no_rounds, subset_to_plot[i], alpha=0.2, color='gray')
+
+        # Best and worst of the plotted sample
+        max_winner_idx = np.argmax(subset_to_plot[:, -1])
+        min_winner_idx = np.argmin(subset_to_plot[:, -1])
+        ax1.plot(no_rounds, subset_to_plot[max_winner_idx], color='green', linewidth=1.5, label='Max Winner')
+        ax1.plot(no_rounds, subset_to_plot[min_winner_idx], color='blue', linewidth=1.5, label='Min Winner')
+
+    ax1.set_title(f"Monte Carlo Simulation: {n_gam} Gamblers")
+    ax1.set_xlabel("Rounds")
+    ax1.set_ylabel("Wealth ($)")
+    ax1.legend(loc='upper left')
+    ax1.grid(True, alpha=0.3)
+
+    #Histogram of final wealths
+    values, counts = result.wealth_values, result.wealth_counts
+    ax2.hist(values, bins=66, weights=counts, color='skyblue', edgecolor='black')
+
+    # Add vertical lines indicating the Mean and Median final wealth.
+    mean_val = np.sum(values * counts) / n_gam
+    median_val = values[np.searchsorted(np.cumsum(counts), n_gam / 2)]
+
+    ax2.axvline(mean_val, color='red', linestyle='dashed', linewidth=2, label=f'Mean: ${mean_val:.2f}')
+    ax2.axvline(median_val, color='orange', linestyle='dashed', linewidth=2, label=f'Median: ${median_val:.2f}')
+
+    ax2.set_title(f"Distribution of Final Wealth (Step {rounds})")
+    ax2.set_xlabel("Final Wealth ($)")
+    ax2.set_ylabel("Frequency")
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    show_or_save(save_path)
+
+
+if __name__ == "__main__":
+    result = simulate_ruin(keep_paths=100)
+    print(f"Ruin probability: {result.ruin_probability:.4f} +/- {result.stderr:.4f}")
+    plot_ruin(result)
+
+    #The final distribution is a Bell Curve (Normal Distribution) centered at $100.
+    #This is due to the Central Limit Theorem.
+    #The spread (Std Dev) is approx sqrt(1000) = 31.62
+    #The Mean and Median are very close, indicating a symmetric distribution.
+    #However, there are many players who have gone broke (final wealth = $0),
+    #which skews the distribution slightly to the left.
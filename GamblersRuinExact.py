@@ -0,0 +1,117 @@
+from collections import namedtuple
+import numpy as np
+from scipy import sparse
+import GamblersRuin
+
+# Exact answers for the gambler's ruin, to check GamblersRuin.simulate_ruin
+# against instead of running ever bigger simulations.
+#
+# Wealth moves in steps of `stake`, so the chain lives on k = number of
+# losing steps (net) that still separate the gambler from ruin: k starts at
+# ceil(start / stake), k = 0 is ruin (wealth <= 0), and an optional target
+# wealth is a second absorbing barrier at the top.
+
+# ruin_times[t] = P(ruined at round t); wealth_values / wealth_probs is the
+# final-wealth distribution (ruin at 0, reaching the target at target)
+ExactRuin = namedtuple("ExactRuin", ["ruin_probability", "target_probability", "ruin_times",
+                                     "wealth_values", "wealth_probs"])
+
+def _steps(start, stake):
+    return -(-start // stake)  # ceil(start / stake)
+
+def ruin_probability(start, p_win=0.5, stake=1, target=None):
+    """
+    Probability of ever being ruined (no round limit), stopping early if
+    wealth reaches `target`. Closed form for fair and biased games.
+    """
+    i = _steps(start, stake)
+    q = 1 - p_win
+    if target is None:
+        # Against an infinitely rich house: sure ruin unless the odds favour us
+        return 1.0 if p_win <= 0.5 else (q / p_win) ** i
+    n = i + _steps(target - start, stake)
+    if p_win == 0.5:
+        return 1 - i / n
+    r = q / p_win
+    # (r^i - r^n) / (1 - r^n), written so large n doesn't overflow
+    if r < 1:
+        return (r**i - r**n) / (1 - r**n)
+    return (1 - r**(i - n)) / (1 - r**-n)
+
+def transition_matrix(n_states, p_win):
+    """
+    Sparse one-round operator on k = 0..n_states-1 (column-stochastic, so
+    dist_next = P @ dist). k = 0 and k = n_states-1 are absorbing.
+    """
+    k = np.arange(1, n_states - 1)
+    rows = np.concatenate([k + 1, k - 1, [0, n_states - 1]])
+    cols = np.concatenate([k, k, [0, n_states - 1]])
+    vals = np.concatenate([np.full(len(k), p_win), np.full(len(k), 1 - p_win), [1.0, 1.0]])
+    return sparse.csr_matrix((vals, (rows, cols)), shape=(n_states, n_states))
+
+def finite_horizon(rounds, start, p_win=0.5, stake=1, target=None):
+    """
+    Exact wealth distribution after `rounds` rounds, and the round ruin
+    happens on, by pushing the distribution through the sparse operator.
+    """
+    i = _steps(start, stake)
+    if target is None:
+        # Top state is out of reach within the horizon, so it never matters
+        n_states = i + rounds + 2
+    else:
+        n_states = i + _steps(target - start, stake) + 1
+    P = transition_matrix(n_states, p_win)
+
+    dist = np.zeros(n_states)
+    dist[i] = 1.0
+    ruined = np.zeros(rounds + 1)
+    for t in range(1, rounds + 1):
+        dist = P @ dist
+        ruined[t] = dist[0]
+    ruin_times = np.diff(ruined, prepend=0.0)
+
+    top = dist[-1] if target is not None else 0.0
+    k = np.arange(1, n_states - 1)
+    values = np.concatenate([[0], start - stake * (i - k)])
+    probs = np.concatenate([[dist[0]], dist[1:-1]])
+    if target is not None:
+        values = np.append(values, target)
+        probs = np.append(probs, top)
+    keep = probs > 0
+    keep[0] = True
+    return ExactRuin(dist[0], top, ruin_times, values[keep], probs[keep])
+
+def simulation_error(result, exact):
+    """
+    How far a GamblersRuin.RuinResult is from the exact answer:
+    ruin probability error (absolute and in standard errors) and the total
+    variation distance of the final-wealth and ruin-time distributions.
+    """
+    n_gam = result.wealth_counts.sum()
+    sim = dict(zip(result.wealth_values, result.wealth_counts / n_gam))
+    ref = dict(zip(exact.wealth_values, exact.wealth_probs))
+    wealth_tv = 0.5 * sum(abs(sim.get(v, 0) - ref.get(v, 0)) for v in set(sim) | set(ref))
+    time_tv = 0.5 * np.abs(result.ruin_times / n_gam - exact.ruin_times).sum()
+
+    error = result.ruin_probability - exact.ruin_probability
+    # Use the exact variance: the simulated one is 0 when no one was ruined
+    q = exact.ruin_probability
+    se = np.sqrt(q * (1 - q) / n_gam)
+    return {
+        "ruin_error": error,
+        "ruin_z": error / se if se > 0 else 0.0,
+        "wealth_tv": wealth_tv,
+        "ruin_time_tv": time_tv,
+    }
+
+if __name__ == "__main__":
+    n_gam, rounds, start = GamblersRuin.n_gam, GamblersRuin.rounds, GamblersRuin.start
+    for p_win in (0.5, 0.49):
+        exact = finite_horizon(rounds, start, p_win)
+        result = GamblersRuin.simulate_ruin(n_gam, rounds, start, p_win)
+        err = simulation_error(result, exact)
+        print(f"p = {p_win}: ruin by round {rounds}: exact {exact.ruin_probability:.5f}, "
+              f"simulated {result.ruin_probability:.5f} ({err['ruin_z']:+.2f} SE)")
+        print(f"         TV distance: final wealth {err['wealth_tv']:.4f}, ruin time {err['ruin_time_tv']:.4f}")
+        print(f"         ruin with no round limit: {ruin_probability(start, p_win):.5f}, "
+              f"before doubling: {ruin_probability(start, p_win, target=2 * start):.5f}")
@@ -1,89 +1,256 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.special import erf
+from random_streams import DEFAULT, RandomStream
+from samplers import SAMPLERS, make_sampler
+from plotting import show_or_save
 
-def run_simulation(predicate_func, bounds, num_samples):
+# estimate with its standard error and confidence interval
+SimulationResult = namedtuple("SimulationResult",
+                              ["estimate", "stderr", "ci_low", "ci_high", "num_samples"])
+
+CHUNK_SIZE = 1_000_000  # Samples drawn at a time: memory stays flat past this
+
+# --- Shapes ---
+# Plain functions (not lambdas) so they can be sent to worker processes
+
+def in_circle(x, y):
+    return (x**2 + y**2) <= 1
+
+def under_parabola(x, y):
+    return y <= x**2
+
+def under_gaussian(x, y):
+    return y <= np.exp(-x**2)
+
+def under_hyperbola(x, y):
+    return y <= 1 / x
+
+def _count_hits(predicate_func, bounds, points):
+    """Hits among unit-square points (2, n) once scaled to bounds."""
+    x_min, x_max, y_min, y_max = bounds
+    x, y = points
+    x = x_min + (x_max - x_min) * x
+    y = y_min + (y_max - y_min) * y
+    return int(np.count_nonzero(predicate_func(x, y)))
+
+def run_simulation(predicate_func, bounds, num_samples, rng=None, chunk_size=CHUNK_SIZE,
+                   target_se=None, target_rel_err=None, confidence=0.95,
+                   verbose=False, return_result=False, sampler="uniform"):
+    """
+    Hit-or-miss area estimate, streamed in chunks of chunk_size samples.
+    Only the running hit count is kept, so memory doesn't grow with num_samples.
+
+    Stops early once the standard error drops to target_se, or the
+    standard error relative to the estimate drops to target_rel_err.
+    num_samples=None means "keep going until a target is met".
+    return_result=True returns a SimulationResult instead of the bare estimate.
+    sampler picks how points are placed (see samplers.SAMPLERS). The
+    standard error assumes independent points; for the other samplers it
+    overstates the real error, so use replicates for their error bars.
+
+    The standard error and interval are Agresti-Coull: unlike the plain
+    sqrt(p(1-p)/n) they don't collapse to 0 when a chunk is all hits or all
+    misses, and a run only stops early once it has seen both.
+    """
+    # rng: a random_streams.RandomStream (default: the shared one)
+    draw = make_sampler(sampler, (rng or DEFAULT).generator)
     x_min, x_max, y_min, y_max = bounds
-    x = np.random.uniform(x_min, x_max, num_samples)
-    y = np.random.uniform(y_min, y_max, num_samples)
-    inside_mask = predicate_func(x, y)
     area_rect = (x_max - x_min) * (y_max - y_min)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    if num_samples is None and target_se is None and target_rel_err is None:
+        raise ValueError("num_samples=None needs target_se or target_rel_err")
+    if num_samples is not None and num_samples <= 0:
+        raise ValueError("num_samples must be positive")
+
+    hits = 0
+    n = 0
+    while num_samples is None or n < num_samples:
+        m = chunk_size if num_samples is None else min(chunk_size, num_samples - n)
+        hits += _count_hits(predicate_func, bounds, draw(m))
+        n += m
+
+        # Each sample is a Bernoulli(p) hit. Agresti-Coull: add z^2/2 hits and
+        # z^2/2 misses, then SE of the area is area * sqrt(p~(1-p~)/(n + z^2))
+        fraction_inside = hits / n
+        estimated_area = area_rect * fraction_inside
+        p_adj = (hits + z * z / 2) / (n + z * z)
+        stderr = area_rect * np.sqrt(p_adj * (1 - p_adj) / (n + z * z))
+        if verbose:
+            print(f"N = {n:>13,} | estimate {estimated_area:.8f} "
+                  f"+/- {z * stderr:.2e} ({confidence:.0%} CI)")
+
+        # Never stop on a run of all hits or all misses
+        if 0 < hits < n:
+            if target_se is not None and stderr <= target_se:
+                break
+            if target_rel_err is not None and stderr / estimated_area <= target_rel_err:
+                break
 
-    fraction_inside = np.sum(inside_mask) / num_samples
-    estimated_area = area_rect * fraction_inside
+    if return_result:
+        center = area_rect * p_adj
+        return SimulationResult(estimated_area, stderr, max(center - z * stderr, 0.0),
+                                min(center + z * stderr, area_rect), n)
     return estimated_area
 
-def solve_circle(n):
+# --- Shape Solvers ---
+# Each solver passes its keyword arguments straight on to run_simulation
+# (rng, sampler, chunk_size, target_se, target_rel_err, return_result, ...)
+
+def solve_circle(n, **kwargs):
     # [cite_start]Predicate: x^2 + y^2 <= 1 [cite: 243]
     # Bounds: [-1, 1] for x and y
     return run_simulation(
-        predicate_func=lambda x, y: (x**2 + y**2) <= 1,
+        predicate_func=in_circle,
         bounds=(-1, 1, -1, 1),
-        num_samples=n
+        num_samples=n,
+        **kwargs
     )
 
-def solve_parabola(n):
+def solve_parabola(n, **kwargs):
     # [cite_start]Predicate: Point is "under" curve if y <= x^2 [cite: 244]
     # Bounds: x in [0, 1]. Max y is 1^2 = 1. So y in [0, 1].
     return run_simulation(
-        predicate_func=lambda x, y: y <= x**2,
+        predicate_func=under_parabola,
         bounds=(0, 1, 0, 1),
-        num_samples=n
+        num_samples=n,
+        **kwargs
     )
 
-def solve_gaussian(n):
+def solve_gaussian(n, **kwargs):
     # [cite_start]Predicate: y <= e^(-x^2) [cite: 245]
     # Bounds: x in [0, 2]. Max y is e^0 = 1. So y in [0, 1].
     return run_simulation(
-        predicate_func=lambda x, y: y <= np.exp(-x**2),
+        predicate_func=under_gaussian,
         bounds=(0, 2, 0, 1),
-        num_samples=n
+        num_samples=n,
+        **kwargs
     )
 
 
-def estimate_e_by_area(num_samples):
+def estimate_e_by_area(num_samples, return_result=False, **kwargs):
+    """
+    Area under y = 1/x from 1 to 2 is ln(2), so e = 2^(1/area).
+    kwargs go to run_simulation; note target_se / target_rel_err apply to
+    the area (ln 2), not to e. return_result=True returns a SimulationResult
+    for e: the interval is the area's mapped through 2^(1/area), the
+    standard error comes from the delta method.
+    """
+    area = run_simulation(
+        predicate_func=under_hyperbola,
+        bounds=(1, 2, 0, 1),
+        num_samples=num_samples,
+        return_result=True,
+        **kwargs
+    )
+    e = 2**(1/area.estimate)
+    if not return_result:
+        return e
+    # d/da 2^(1/a) = -ln(2) * 2^(1/a) / a^2; the map is decreasing, so the ends swap
+    stderr = np.log(2) * e / area.estimate**2 * area.stderr
+    ci_low = 2**(1/area.ci_high)
+    ci_high = 2**(1/area.ci_low) if area.ci_low > 0 else np.inf
+    return SimulationResult(e, stderr, ci_low, ci_high, area.num_samples)
 
-    x = np.random.uniform(1, 2, num_samples)
-    y = np.random.uniform(0, 1, num_samples)
-    
-    area = 1/x
-    inside_mask = area >= y
+def estimate_e_by_prob(num_samples, rng=None, chunk_size=CHUNK_SIZE, confidence=0.95,
+                       return_result=False):
+    """
+    Method 2: Forsythe's "Magic" Method (Sequence Length) [cite: 213-221]
+    Runs chunk_size sequences at a time (about 17 bytes each, so the caller
+    sets the memory bound). return_result=True returns a SimulationResult
+    with the standard error of the mean length.
+    """
+    total, total_sq = _sequence_length_moments(num_samples, rng, chunk_size)
+    mean = total / num_samples
+    stderr = np.sqrt(max(total_sq / num_samples - mean**2, 0) / num_samples)
+    if return_result:
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        return SimulationResult(mean, stderr, mean - z * stderr, mean + z * stderr, num_samples)
+    return mean
 
+def _sequence_length_moments(num_samples, rng=None, chunk_size=CHUNK_SIZE):
+    # We need to find n such that u1 > u2 > ... > un <= un+1 (u1 = 1.0)
+    # The expected value of n is e.
+    # Returns (sum of n, sum of n^2) over num_samples sequences.
+    gen = (rng or DEFAULT).generator
+    total = 0
+    total_sq = 0
+    for start in range(0, num_samples, chunk_size):
+        # Last number of every sequence still going (all start at u1 = 1.0)
+        prev = np.ones(min(chunk_size, num_samples - start))
+        length = 1
+        while len(prev):
+            # One new number per running sequence only -- about e draws per
+            # sequence in total, and no cap on how long one can get
+            u = gen.random(len(prev))
+            still = u < prev
+            # A sequence that stops here has length n = `length`
+            ended = len(prev) - int(np.count_nonzero(still))
+            total += length * ended
+            total_sq += length * length * ended
+            prev = u[still]
+            length += 1
+    return total, total_sq
 
+def _sequence_length_sum(num_samples, rng=None):
+    return _sequence_length_moments(num_samples, rng)[0]
 
-    e_estimate = 2**(1/(np.sum(inside_mask)/num_samples))
+# --- Parallel Estimation ---
+# A sample budget is cut into fixed blocks of shard_size samples, and block
+# k always gets the k-th child of SeedSequence(seed). Each block returns an
+# integer count and the counts are summed, so the answer is bit-for-bit the
+# same for a given seed however many workers run the blocks.
 
-    return e_estimate
-def estimate_e_by_prob(num_samples):
-    # Method 2: Forsythe's "Magic" Method (Sequence Length) [cite: 213-221]
-    # We need to find n such that u1 > u2 > ... > un <= un+1
-    # The expected value of n is e.
-    
-    # 1. Create a "safety buffer" of columns. 
-    # Sequences > 20 are statistically impossible (1/20! chance).
-    max_cols = 20
-    
-    # 2. Generate matrix of random numbers (N rows, 20 cols)
-    random_matrix = np.random.uniform(0, 1, (num_samples, max_cols))
-    
-    # 3. Prepend a column of 1s (u1 = 1.0)
-    ones_col = np.ones((num_samples, 1))
-    matrix = np.hstack((ones_col, random_matrix))
-    
-    # 4. Check Strict Decreasing Condition: Col[i] > Col[i+1]
-    # This creates a boolean matrix
-    condition_met = matrix[:, :-1] > matrix[:, 1:]
-    
-    # 5. Find length of valid sequence
-    # cumprod works like a latch: T, T, F, T -> T, T, F, F
-    valid_sequences = np.cumprod(condition_met, axis=1)
-    
-    # Summing the True values gives the length of the sequence
-    # We add 1 because the count includes the starting number u1
-    ns = np.sum(valid_sequences, axis=1) + 1
-    
-    # 6. Average length is our estimate for e
-    return np.mean(ns)
+def _shard_sizes(num_samples, shard_size):
+    return [min(shard_size, num_samples - start) for start in range(0, num_samples, shard_size)]
+
+def _hit_shard(args):
+    """Runs in a worker process. Returns the hit count of one block."""
+    predicate_func, bounds, num_samples, seed, sampler = args
+    draw = make_sampler(sampler, RandomStream(seed).generator)
+    hits = 0
+    for start in range(0, num_samples, CHUNK_SIZE):
+        hits += _count_hits(predicate_func, bounds, draw(min(CHUNK_SIZE, num_samples - start)))
+    return hits
+
+def run_simulation_parallel(predicate_func, bounds, num_samples, n_workers=None,
+                            shard_size=10 * CHUNK_SIZE, seed=0, sampler="uniform"):
+    """
+    Same estimate as run_simulation, spread over a process pool.
+    predicate_func must be picklable (a module-level function, not a lambda).
+    """
+    x_min, x_max, y_min, y_max = bounds
+    sizes = _shard_sizes(num_samples, shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(predicate_func, bounds, size, shard_seed, sampler)
+            for size, shard_seed in zip(sizes, seeds)]
+
+    with ProcessPoolExecutor(max_workers=n_workers or os.cpu_count()) as pool:
+        hits = sum(pool.map(_hit_shard, jobs))
+
+    return (x_max - x_min) * (y_max - y_min) * hits / num_samples
+
+def estimate_e_by_area_parallel(num_samples, **kwargs):
+    # kwargs go to run_simulation_parallel (n_workers, shard_size, seed, sampler)
+    area = run_simulation_parallel(under_hyperbola, (1, 2, 0, 1), num_samples, **kwargs)
+    return 2**(1/area)
+
+def _sequence_shard(args):
+    """Runs in a worker process. Returns the summed sequence lengths of one block."""
+    num_samples, seed = args
+    return _sequence_length_sum(num_samples, RandomStream(seed))
+
+def estimate_e_by_prob_parallel(num_samples, n_workers=None, shard_size=CHUNK_SIZE, seed=0):
+    """estimate_e_by_prob spread over a process pool."""
+    sizes = _shard_sizes(num_samples, shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    with ProcessPoolExecutor(max_workers=n_workers or os.cpu_count()) as pool:
+        total = sum(pool.map(_sequence_shard, zip(sizes, seeds)))
+    return total / num_samples
 
 
 # def estimate_pi(num_samples):
@@ -125,63 +292,131 @@ if __name__ == "__main__":
     print(f"\n[Gaussian] Estimated Area:    {gaussian_area:.5f}")
     print(f"[Gaussian] True Area (erf):     {true_gaussian:.5f}")
 
-def generate_pi_plots():
-    print("Running convergence simulation for N = 10^1 to 10^7...")
+# --- One-Pass Convergence ---
+# Every N on a convergence curve can be a prefix of one long stream: draw
+# the stream in chunks, keep a running total (hits, or summed sequence
+# lengths) and read the estimate off each time the stream passes a
+# checkpoint N. One pass to the largest N gives the whole curve.
+
+# name -> (make_counter(rng, sampler), estimate(total, n), true value)
+# A counter takes a sample count and returns its integer total
+CONVERGENCE_ESTIMATORS = {
+    "circle": (lambda rng, sampler: _area_counter(in_circle, (-1, 1, -1, 1), rng, sampler),
+               lambda total, n: 4 * total / n, np.pi),
+    "parabola": (lambda rng, sampler: _area_counter(under_parabola, (0, 1, 0, 1), rng, sampler),
+                 lambda total, n: total / n, 1/3),
+    "gaussian": (lambda rng, sampler: _area_counter(under_gaussian, (0, 2, 0, 1), rng, sampler),
+                 lambda total, n: 2 * total / n, (np.sqrt(np.pi) / 2) * erf(2)),
+    "e_area": (lambda rng, sampler: _area_counter(under_hyperbola, (1, 2, 0, 1), rng, sampler),
+               lambda total, n: 2**(n / total), np.e),
+    "e_magic": (lambda rng, sampler: lambda n: _sequence_length_sum(n, rng),
+                lambda total, n: total / n, np.e),
+}
+
+def _area_counter(predicate_func, bounds, rng, sampler):
+    draw = make_sampler(sampler, rng.generator)
+    return lambda n: _count_hits(predicate_func, bounds, draw(n))
+
+def convergence_curve(name, ns, rng=None, sampler="uniform", chunk_size=CHUNK_SIZE):
+    """
+    Estimates of CONVERGENCE_ESTIMATORS[name] at every N in ns, from one
+    stream of max(ns) samples. Memory stays flat (chunks of chunk_size).
+    """
+    make_counter, estimate, _ = CONVERGENCE_ESTIMATORS[name]
+    count = make_counter(rng or DEFAULT, sampler)
+    ns = np.asarray(ns, dtype=np.int64)
+
+    # Cut the stream at every checkpoint and every chunk_size samples
+    stops = np.union1d(ns, np.arange(chunk_size, ns.max(), chunk_size))
+    totals = {}
+    total = 0
+    done = 0
+    for stop in stops:
+        total += count(int(stop - done))
+        done = int(stop)
+        totals[done] = total
+    return np.array([estimate(totals[n], n) for n in ns])
+
+def _convergence_job(args):
+    """Runs in a worker process: one replicate of one estimator's curve."""
+    name, ns, sampler, chunk_size, seed = args
+    return convergence_curve(name, ns, RandomStream(seed), sampler, chunk_size)
+
+def convergence_study(names, ns, replicates=1, sampler="uniform", n_workers=None,
+                      seed=None, chunk_size=CHUNK_SIZE):
+    """
+    `replicates` independent one-pass curves per estimator, run in a pool.
+    Returns {name: estimates of shape (replicates, len(ns))}.
+    """
+    jobs = [(name, ns, sampler, chunk_size) for name in names for _ in range(replicates)]
+    seeds = np.random.SeedSequence(seed).spawn(len(jobs))
+    with ProcessPoolExecutor(max_workers=n_workers or os.cpu_count()) as pool:
+        curves = list(pool.map(_convergence_job, [job + (s,) for job, s in zip(jobs, seeds)]))
+    curves = np.array(curves).reshape(len(names), replicates, len(ns))
+    return dict(zip(names, curves))
+
+def _plot_errors(ax, ns, errors, fmt, **kwargs):
+    """RMS error line, with a band over the middle 80% of replicates."""
+    line, = ax.plot(ns, np.sqrt(np.mean(errors**2, axis=0)), fmt, alpha=0.7, **kwargs)
+    if len(errors) > 1:
+        ax.fill_between(ns, np.percentile(errors, 10, axis=0), np.percentile(errors, 90, axis=0),
+                        color=line.get_color(), alpha=0.15)
+
+def plot_convergence(name, ns, estimates, save_path=None):
+    """
+    Percent error vs N for one CONVERGENCE_ESTIMATORS curve (estimates of
+    shape (len(ns),), or (replicates, len(ns)) for an error band).
+    """
+    truth = CONVERGENCE_ESTIMATORS[name][2]
+    errors = np.abs(np.atleast_2d(estimates) - truth) / truth * 100
+
+    fig, ax = plt.subplots(figsize=(10, 7))
+    _plot_errors(ax, ns, errors, '-o', label=name)
+    ax.plot(ns, 100 / np.sqrt(ns), 'k--', label=r'Theoretical $1/\sqrt{N}$')
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlabel('Number of Samples (N)')
+    ax.set_ylabel('Percent Error (%)')
+    ax.set_title(f'{name} Error Convergence')
+    ax.legend()
+    ax.grid(True, which="both", alpha=0.3)
+    plt.tight_layout()
+    show_or_save(save_path)
+
+def generate_pi_plots(sampler="uniform", n_workers=None, seed=None, max_n=10**6,
+                      replicates=1, num_points=20, save_path=None):
+    # sampler: how the shape / area estimators place their points (see samplers.py)
+    # seed: same seed, same plot (whatever n_workers is)
+    # replicates > 1 draws error bands; max_n can go to 10^9 (one pass per replicate)
+    # save_path: write the figure there instead of showing it
+    print(f"Running convergence simulation for N = 10^1 to {max_n:.0e}...")
     
     # [cite_start]# [cite: 262] recommends exponential scaling
-    # We use fewer points (20) to keep it fast, but span up to 10^6 or 10^7
-    ns = np.logspace(1, 6, num=20, dtype=int) 
+    ns = np.unique(np.logspace(1, np.log10(max_n), num=num_points).astype(np.int64))
     
-    # --- Ground Truths for Error Calculation ---
-    true_pi = np.pi                                # [cite: 166]
-    true_parabola = 1/3                            # [cite: 244]
-    true_gaussian = (np.sqrt(np.pi) / 2) * erf(2)  # [cite: 245, 315]
-    true_e = np.e                                  # [cite: 202]
-
-    # --- Data Storage ---
-    # Shapes
-    errors_circle = []
-    errors_parabola = []
-    errors_gaussian = []
-    
-    # Euler's Number
-    estimates_e_area = []
-    errors_e_area = []
-    estimates_e_magic = []
-    errors_e_magic = []
-    
-    # --- Simulation Loop ---
-    for n in ns:
-        # 1. Circle (Pi)
-        est_c = solve_circle(n)
-        errors_circle.append(abs(est_c - true_pi) / true_pi * 100)
-        
-        # 2. Parabola
-        est_p = solve_parabola(n)
-        errors_parabola.append(abs(est_p - true_parabola) / true_parabola * 100)
-        
-        # 3. Gaussian
-        est_g = solve_gaussian(n)
-        errors_gaussian.append(abs(est_g - true_gaussian) / true_gaussian * 100)
-        
-        # 4. e (Method 1: Area)
-        est_e1 = estimate_e_by_area(n)
-        estimates_e_area.append(est_e1)
-        errors_e_area.append(abs(est_e1 - true_e) / true_e * 100)
-        
-        # 5. e (Method 2: Magic/Prob)
-        est_e2 = estimate_e_by_prob(n)
-        estimates_e_magic.append(est_e2)
-        errors_e_magic.append(abs(est_e2 - true_e) / true_e * 100)
+    # --- Simulation ---
+    # One pass per (estimator, replicate), all run in the pool at once
+    names = ["circle", "parabola", "gaussian", "e_area", "e_magic"]
+    est = convergence_study(names, ns, replicates, sampler, n_workers, seed)
+
+    def percent_error(name):
+        truth = CONVERGENCE_ESTIMATORS[name][2]
+        return np.abs(est[name] - truth) / truth * 100
+
+    errors_circle = percent_error("circle")
+    errors_parabola = percent_error("parabola")
+    errors_gaussian = percent_error("gaussian")
+    errors_e_area = percent_error("e_area")
+    errors_e_magic = percent_error("e_magic")
 
     # --- Plotting ---
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 7))
 
     # Plot 1: Shapes Error Convergence (Log-Log)
     # This fulfills the sub-task requirement to plot errors for Circle, Parabola, Gaussian
-    ax1.plot(ns, errors_circle, '-o', label='Circle (Pi)', alpha=0.7)
-    ax1.plot(ns, errors_parabola, '-s', label='Parabola (1/3)', alpha=0.7)
-    ax1.plot(ns, errors_gaussian, '-^', label='Gaussian (erf)', alpha=0.7)
+    _plot_errors(ax1, ns, errors_circle, '-o', label='Circle (Pi)')
+    _plot_errors(ax1, ns, errors_parabola, '-s', label='Parabola (1/3)')
+    _plot_errors(ax1, ns, errors_gaussian, '-^', label='Gaussian (erf)')
     
     # [cite_start]Theoretical 1/sqrt(N) line for reference [cite: 261]
     ref_line = 100 / np.sqrt(ns)
@@ -196,8 +431,8 @@ def generate_pi_plots():
     ax1.grid(True, which="both", alpha=0.3)
 
     # Plot 2: Euler's Number Comparison (Area vs Magic)
-    ax2.plot(ns, errors_e_area, '-o', color='royalblue', label='Area Method Error', alpha=0.7)
-    ax2.plot(ns, errors_e_magic, '-o', color='purple', label='Magic/Prob Method Error', alpha=0.7)
+    _plot_errors(ax2, ns, errors_e_area, '-o', color='royalblue', label='Area Method Error')
+    _plot_errors(ax2, ns, errors_e_magic, '-o', color='purple', label='Magic/Prob Method Error')
     ax2.plot(ns, ref_line, 'k--', label=r'Theoretical $1/\sqrt{N}$')
     
     ax2.set_xscale('log')
@@ -209,8 +444,39 @@ def generate_pi_plots():
     ax2.grid(True, which="both", alpha=0.3)
 
     plt.tight_layout()
-    plt.show()
+    show_or_save(save_path)
+
+def compare_samplers(solver=solve_circle, true_value=np.pi, samplers=None, replicates=10, ns=None,
+                     save_path=None):
+    """
+    Error vs N for each sampler on one estimator. Each point is the RMSE over
+    `replicates` independent runs; the bars are the spread of those runs.
+    """
+    samplers = samplers or list(SAMPLERS)
+    ns = ns if ns is not None else np.logspace(2, 6, num=9, dtype=int)
+    # One child stream per (sampler, replicate), so runs don't share draws
+    streams = DEFAULT.spawn(len(samplers) * replicates)
+
+    fig, ax = plt.subplots(figsize=(10, 7))
+    for i, name in enumerate(samplers):
+        runs = streams[i * replicates:(i + 1) * replicates]
+        errors = np.array([[abs(solver(n, rng=r, sampler=name) - true_value) / true_value * 100
+                            for r in runs] for n in ns])
+        rmse = np.sqrt(np.mean(errors**2, axis=1))
+        ax.errorbar(ns, rmse, yerr=errors.std(axis=1), fmt='-o', capsize=3, label=name, alpha=0.8)
+        print(f"{name:>10}: {rmse[-1]:.2e}% error at N = {ns[-1]:,}")
+
+    ax.plot(ns, 100 / np.sqrt(ns), 'k--', label=r'Theoretical $1/\sqrt{N}$')
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlabel('Number of Samples (N)')
+    ax.set_ylabel(f'Percent Error (%), RMS over {replicates} runs')
+    ax.set_title('Sampler Comparison')
+    ax.legend()
+    ax.grid(True, which="both", alpha=0.3)
+    plt.tight_layout()
+    show_or_save(save_path)
 
 if __name__ == "__main__":
     generate_pi_plots()
-
+    compare_samplers()
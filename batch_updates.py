@@ -0,0 +1,102 @@
+import numpy as np
+from blackjack import DEALER_CARDS
+from episode_log import segment_suffix_sums
+
+# Batched Monte Carlo updates.
+# K episodes come in as flat arrays (one entry per step) plus episode
+# offsets, the same layout episode_log stores: episode k is steps
+# offsets[k]:offsets[k + 1]. First-visit masks and the sums / counts are
+# computed with NumPy over the whole batch, not one tuple at a time.
+
+def first_visit_mask(codes, offsets):
+    """True at the first step of each episode where its code appears."""
+    lengths = np.diff(offsets)
+    episode_ids = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+    # One key per (episode, code); np.unique finds where each key first shows up
+    keys = episode_ids * (int(codes.max(initial=0)) + 1) + codes
+    _, first = np.unique(keys, return_index=True)
+    mask = np.zeros(len(codes), dtype=bool)
+    mask[first] = True
+    return mask
+
+def batch_returns(codes, rewards, offsets, n_codes, first_visit=True):
+    """
+    Sum and count of the returns seen at every code (a state, or a
+    state-action pair). first_visit=False counts every visit.
+    Returns (sums, counts), each of length n_codes.
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    G = segment_suffix_sums(np.asarray(rewards, dtype=np.float64), offsets)
+    if first_visit:
+        mask = first_visit_mask(codes, offsets)
+        codes, G = codes[mask], G[mask]
+    sums = np.bincount(codes, weights=G, minlength=n_codes)
+    counts = np.bincount(codes, minlength=n_codes)
+    return sums, counts
+
+def apply_constant_alpha(Q_flat, sums, counts, alpha):
+    """
+    The batch form of Q <- Q + alpha * (G - Q). A code seen n times in the
+    batch moves toward the batch mean return with weight 1 - (1 - alpha)^n,
+    which is exactly what n sequential updates do when the returns are equal.
+    Q_flat is updated in place.
+    """
+    seen = counts > 0
+    keep = (1 - alpha) ** counts[seen]
+    Q_flat[seen] = keep * Q_flat[seen] + (1 - keep) * (sums[seen] / counts[seen])
+
+class VecEpisodeCollector:
+    """
+    Runs a VecBlackjackEnv and hands back finished episodes as flat arrays.
+    Games still in progress when a batch is cut off, and finished episodes
+    beyond the number asked for, are kept for the next batch.
+    """
+    def __init__(self, env):
+        self.env = env
+        self.states = env.reset()
+        self._pending = None  # Steps of unfinished games
+
+    def collect(self, choose_actions, n_episodes):
+        """
+        choose_actions(codes) -> actions, with codes = encoded states of every game.
+        Steps the env until n_episodes games have finished.
+        Returns {"states", "actions", "rewards", "offsets"} for exactly n_episodes episodes.
+        """
+        n = self.env.n_envs
+        env_ids = np.arange(n)
+        columns = [] if self._pending is None else [self._pending]
+        # Episodes left over from the last batch count toward this one
+        finished = 0 if self._pending is None else int(self._pending[4].sum())
+        while finished < n_episodes:
+            player_sum, dealer_card, usable = self.states
+            codes = (player_sum.astype(np.int64) * DEALER_CARDS + dealer_card) * 2 + usable
+            actions = np.asarray(choose_actions(codes), dtype=np.int8)
+            self.states, rewards, dones = self.env.step(actions)
+            columns.append((env_ids, codes, actions, rewards, dones))
+            finished += int(dones.sum())
+
+        ids, codes, actions, rewards, dones = (np.concatenate(c) for c in zip(*columns))
+
+        # Line the steps up game by game (stable sort keeps time order)
+        order = np.argsort(ids, kind="stable")
+        ids, codes, actions, rewards, dones = ids[order], codes[order], actions[order], rewards[order], dones[order]
+
+        # A step belongs to a finished episode if its game finishes later on
+        position = np.arange(len(ids))
+        starts = np.searchsorted(ids, env_ids)
+        last_done = np.maximum.reduceat(np.where(dones, position, -1), starts)
+        complete = position <= last_done[ids]
+
+        # Hand back the first n_episodes finished episodes (in game order);
+        # the rest wait for the next batch
+        cut = np.flatnonzero(dones & complete)[n_episodes - 1]
+        take = complete & (position <= cut)
+
+        self._pending = tuple(c[~take] for c in (ids, codes, actions, rewards, dones))
+        ends = np.flatnonzero(dones[take]) + 1
+        return {
+            "states": codes[take],
+            "actions": actions[take],
+            "rewards": rewards[take],
+            "offsets": np.concatenate([[0], ends]),
+        }
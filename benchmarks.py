@@ -0,0 +1,184 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+import GamblersRuin
+import MonteCarlo
+import mc_control
+import mc_predictions
+from blackjack import BlackjackEnv
+from random_streams import seed_all
+
+# Benchmark suite for the environment, the learners and the Monte Carlo
+# estimators. Every case is seeded, timed (best of `repeats`) and reported as
+# units/sec; the estimator cases also report peak traced memory.
+#
+#   python benchmarks.py --out bench.json            # run and save
+#   python benchmarks.py --compare bench.json        # run and flag regressions
+
+SEED = 1234
+
+# --- Cases ---
+# Each case takes a size and does `size` units of work (resets, steps,
+# episodes, samples, gamblers...).
+
+def bench_env_reset(n):
+    env = BlackjackEnv()
+    for _ in range(n):
+        env.reset()
+
+def bench_env_step(n):
+    env = BlackjackEnv()
+    state = env.reset()
+    for _ in range(n):
+        state, reward, done = env.step(int(state[0] < 17))
+        if done:
+            state = env.reset()
+
+def bench_control_episode(n):
+    env = BlackjackEnv()
+    Q = mc_control.new_q_table()
+    for _ in range(n):
+        mc_control.generate_episode(env, Q, mc_control.EPSILON)
+
+def bench_prediction_episode(n):
+    env = BlackjackEnv()
+    for _ in range(n):
+        mc_predictions.generate_episode(env, mc_predictions.simple_policy)
+
+def bench_train_mc_control(n):
+    mc_control.train_mc_control(BlackjackEnv(), n)
+
+def bench_mc_prediction(n):
+    mc_predictions.mc_prediction(BlackjackEnv(), n, mc_predictions.simple_policy)
+
+def bench_run_simulation(n):
+    MonteCarlo.solve_circle(n)
+
+def bench_estimate_e_by_prob(n):
+    MonteCarlo.estimate_e_by_prob(n)
+
+def bench_gamblers_ruin(n):
+    GamblersRuin.simulate_ruin(n_gam=n, rounds=1000, start=100)
+
+# name -> (function, unit, sizes, track_memory)
+CASES = {
+    "env.reset":                    (bench_env_reset, "resets", [100_000], False),
+    "env.step":                     (bench_env_step, "steps", [100_000], False),
+    "mc_control.generate_episode":  (bench_control_episode, "episodes", [50_000], False),
+    "mc_predictions.generate_episode": (bench_prediction_episode, "episodes", [50_000], False),
+    "train_mc_control":             (bench_train_mc_control, "episodes", [50_000], False),
+    "mc_prediction":                (bench_mc_prediction, "episodes", [50_000], False),
+    "run_simulation":               (bench_run_simulation, "samples", [10**4, 10**5, 10**6], True),
+    "estimate_e_by_prob":           (bench_estimate_e_by_prob, "samples", [10**4, 10**5, 10**6], True),
+    "gamblers_ruin":                (bench_gamblers_ruin, "gamblers", [100, 1_000, 10_000], True),
+}
+
+def run_case(func, size, repeats, track_memory, seed):
+    """Best-of-`repeats` wall time, plus peak traced memory of one extra run."""
+    best = float("inf")
+    for _ in range(repeats):
+        seed_all(seed)
+        # The learners print progress; keep the benchmark output clean
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func(size)
+            best = min(best, time.perf_counter() - start)
+
+    peak = None
+    if track_memory:
+        # Separate run: tracing slows things down, so it isn't timed
+        seed_all(seed)
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(size)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, peak
+
+def run_all(names=None, repeats=3, scale=1.0, seed=SEED):
+    results = {}
+    for name, (func, unit, sizes, track_memory) in CASES.items():
+        if names and name not in names:
+            continue
+        for size in sizes:
+            size = max(1, int(size * scale))
+            seconds, peak = run_case(func, size, repeats, track_memory, seed)
+            key = f"{name}[{size}]"
+            results[key] = {
+                "unit": unit,
+                "size": size,
+                "seconds": seconds,
+                "per_sec": size / seconds,
+                "peak_bytes": peak,
+            }
+            mem = f" | peak {peak / 2**20:8.1f} MiB" if peak is not None else ""
+            print(f"{key:45s} {size / seconds:14,.0f} {unit}/sec{mem}")
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": seed,
+            "repeats": repeats,
+        },
+        "results": results,
+    }
+
+def compare(current, baseline, tolerance=0.10):
+    """
+    Returns the list of regressions: throughput down, or peak memory up,
+    by more than `tolerance` (a fraction) against the baseline.
+    """
+    regressions = []
+    for key, base in baseline["results"].items():
+        now = current["results"].get(key)
+        if now is None:
+            continue
+        speed = now["per_sec"] / base["per_sec"]
+        if speed < 1 - tolerance:
+            regressions.append(f"{key}: {speed:.2f}x throughput ({base['per_sec']:,.0f} -> {now['per_sec']:,.0f} {now['unit']}/sec)")
+        if base["peak_bytes"] and now["peak_bytes"] is not None:
+            mem = now["peak_bytes"] / base["peak_bytes"]
+            if mem > 1 + tolerance:
+                regressions.append(f"{key}: {mem:.2f}x peak memory ({base['peak_bytes']:,} -> {now['peak_bytes']:,} bytes)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the env, learners and estimators.")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag regressions against a saved JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown / growth (default 0.10)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every size (e.g. 0.1 for a quick run)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("cases", nargs="*", help="only run these cases (default: all)")
+    args = parser.parse_args(argv)
+
+    current = run_all(args.cases, args.repeats, args.scale, args.seed)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,114 @@
+import time
+from functools import lru_cache
+import numpy as np
 from cards import Deck, Hand  # Importing your existing classes
 
+# --- Card table for the vectorized env ---
+# The batched env uses an infinite deck: every draw is one of the 13 ranks
+# with equal probability. Aces are stored as 1 here (the "hard" value);
+# whether one of them can count as 11 is tracked separately.
+# Ranks:               2  3  4  5  6  7  8  9  10 J   Q   K   A
+HARD_VALUES = np.array([2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 1], dtype=np.int8)
+
+# --- State space ---
+# A state is (Player Score, Dealer Show Card, Usable Ace). Scores in a state
+# are at most 21 and show cards run 2-11, so a table indexed directly by
+# those numbers needs 22 x 12 x 2 cells (the few impossible ones stay unused).
+PLAYER_SUMS = 22
+DEALER_CARDS = 12
+STATE_SHAPE = (PLAYER_SUMS, DEALER_CARDS, 2)
+NUM_STATES = PLAYER_SUMS * DEALER_CARDS * 2
+
+def encode_state(state):
+    """Turns a state tuple into one integer: its flat index in STATE_SHAPE."""
+    player_sum, dealer_card, usable_ace = state
+    return (player_sum * DEALER_CARDS + dealer_card) * 2 + int(usable_ace)
+
+def decode_state(code):
+    """Inverse of encode_state."""
+    rest, usable_ace = divmod(code, 2)
+    player_sum, dealer_card = divmod(rest, DEALER_CARDS)
+    return (player_sum, dealer_card, bool(usable_ace))
+
+# --- Dealer Outcome Table ---
+# With an infinite deck, where the dealer ends up (17-21 or bust) depends only
+# on the show card, so it can be worked out once instead of played out.
+# Infinite deck chance of each hard card value (index = value, Ace = 1)
+CARD_PROBS = np.array([0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 4]) / 13
+DEALER_FINALS = [17, 18, 19, 20, 21]  # Outcome k < 5 means the dealer stands on 17 + k
+BUST = 5                              # Outcome 5 means the dealer busts
+
+@lru_cache(maxsize=None)
+def dealer_outcome_table(hit_soft_17=False):
+    """
+    table[show_card, k] = chance the dealer finishes on outcome k,
+    for show cards 2-11 (Ace = 11). Cached per rule set.
+    """
+    memo = {}
+
+    def finish(hard, has_ace):
+        # Distribution over the 6 outcomes from a dealer hand (hard, has_ace)
+        key = (hard, has_ace)
+        if key not in memo:
+            soft = has_ace and hard + 10 <= 21
+            value = hard + 10 if soft else hard
+            dist = np.zeros(6)
+            if value > 21:
+                dist[BUST] = 1
+            elif value >= 17 and not (hit_soft_17 and soft and value == 17):
+                dist[value - 17] = 1
+            else:
+                for card in range(1, 11):
+                    dist += CARD_PROBS[card] * finish(hard + card, has_ace or card == 1)
+            memo[key] = dist
+        return memo[key]
+
+    table = np.zeros((DEALER_CARDS, 6))
+    for show_card in range(2, 12):
+        # The hole card and every hit come out of finish()
+        table[show_card] = finish(1 if show_card == 11 else show_card, show_card == 11)
+    table.flags.writeable = False
+    return table
+
+@lru_cache(maxsize=None)
+def stick_reward_table(hit_soft_17=False):
+    """
+    table[player_sum, show_card] = exact expected reward of sticking
+    (same +1 / 0 / -1 rules as BlackjackEnv.step).
+    """
+    outcomes = dealer_outcome_table(hit_soft_17)
+    player = np.arange(PLAYER_SUMS)[:, None]
+    finals = np.array(DEALER_FINALS)[None, :]
+    # Reward against each dealer final total, then +1 when the dealer busts
+    vs_final = np.sign(player - finals)
+    table = vs_final @ outcomes[:, :BUST].T + outcomes[:, BUST]
+    table.flags.writeable = False
+    return table
+
 class BlackjackEnv:
-    def __init__(self):
-        self.deck = Deck()
+    def __init__(self, deck=None, dealer="play", hit_soft_17=False):
+        """
+        dealer = "play":     the dealer draws real cards until >= 17
+                 "sample":   the dealer's final total is drawn in one go from
+                             dealer_outcome_table (infinite deck odds)
+                 "expected": a stick returns the exact expected reward
+        """
+        # Pass a cards.Shoe to play from a multi-deck shoe instead of
+        # a fresh 52 card deck every hand.
+        self.deck = deck if deck is not None else Deck()
         self.player_hand = Hand()
         self.dealer_hand = Hand()
+        self.dealer = dealer
+        self.hit_soft_17 = hit_soft_17
+        self.profiler = None  # Set by profiling.TrainingProfiler to time the dealer
+
+        # Plain lists: faster than NumPy for one lookup at a time
+        self._dealer_cdf = np.cumsum(dealer_outcome_table(hit_soft_17), axis=1).tolist()
+        self._stick_rewards = stick_reward_table(hit_soft_17).tolist()
 
     def reset(self):
         """Resets the game and deals the first 4 cards."""
-        self.deck.reset()
+        self.deck.reset()  # A Shoe only reshuffles once the cut card is out
         self.player_hand = Hand()
         self.dealer_hand = Hand()
         
@@ -31,22 +131,31 @@ class BlackjackEnv:
             self.player_hand.add_card(self.deck.draw())
             
             # Check for Bust
-            if self.player_hand.get_value() > 21:
+            if self.player_hand.is_bust():
                 return self._get_state(), -1, True  # Reward -1, Game Over
             else:
                 return self._get_state(), 0, False  # Reward 0, Keep Playing
         
         # --- PLAYER STICKS (Action 0) ---
+        elif self.dealer != "play":
+            return self._get_state(), self._fast_dealer_reward(), True
         else:
+            dealer_start = time.perf_counter() if self.profiler is not None else 0.0
+
             # Dealer plays out their turn (Standard Rule: Hit until >= 17)
-            while self.dealer_hand.get_value() < 17:
+            while self.dealer_hand.get_value() < 17 or (
+                    self.hit_soft_17 and self.dealer_hand.get_value() == 17
+                    and self.dealer_hand.is_soft()):
                 self.dealer_hand.add_card(self.deck.draw())
+
+            if self.profiler is not None:
+                self.profiler.add("dealer", time.perf_counter() - dealer_start)
             
             # Calculate Winner
             p_val = self.player_hand.get_value()
             d_val = self.dealer_hand.get_value()
             
-            if d_val > 21:
+            if self.dealer_hand.is_bust():
                 return self._get_state(), 1, True   # Dealer busted, You win (+1)
             elif p_val > d_val:
                 return self._get_state(), 1, True   # You have higher score (+1)
@@ -55,6 +164,24 @@ class BlackjackEnv:
             else:
                 return self._get_state(), 0, True   # Tie (0)
 
+    def _fast_dealer_reward(self):
+        """Resolves a stick from the dealer outcome table (no cards drawn)."""
+        p_val = self.player_hand.get_value()
+        show_card = self.dealer_hand.cards[0].value
+        if self.dealer == "expected":
+            return self._stick_rewards[p_val][show_card]
+
+        # One categorical draw: first outcome whose cumulative chance passes u
+        u = self.deck.rng.random()
+        cdf = self._dealer_cdf[show_card]
+        outcome = 0
+        while outcome < BUST and u >= cdf[outcome]:
+            outcome += 1
+        if outcome == BUST:
+            return 1
+        d_val = DEALER_FINALS[outcome]
+        return (p_val > d_val) - (p_val < d_val)
+
     def _get_state(self):
         """
         Converts your objects into the standard RL tuple:
@@ -62,27 +189,143 @@ class BlackjackEnv:
         """
         # 1. Player Score
         score = self.player_hand.get_value()
-        
+
         # 2. Dealer Show Card (The first card dealt to dealer)
-        # We need to convert the card object to a number (1-10)
-        show_card = self.dealer_hand.cards[0]
-        
-        # Quick helper to safely get value from your card class
-        # (Assumes your cards have a .rank attribute based on your print statement)
-        try:
-            if str(show_card.rank) in ['Jack', 'Queen', 'King']:
-                card_val = 10
-            elif str(show_card.rank) == 'Ace':
-                card_val = 11
-            else:
-                card_val = int(show_card.rank)
-        except:
-            card_val = 10 # Fallback
-            
+        # Card.value is already a number: 2-10, faces = 10, Ace = 11
+        card_val = self.dealer_hand.cards[0].value
+
         # 3. Usable Ace
-        # (A simplified check: do we have an Ace and is the score <= 21?)
-        # For a perfect implementation, check if value is 'soft' (counted as 11)
-        # But for this assignment, just checking if an Ace exists is usually enough context
-        has_ace = any(str(c.rank) == 'Ace' for c in self.player_hand.cards)
-        
-        return (score, card_val, has_ace)
\ No newline at end of file
+        # The hand tracks whether an Ace is being counted as 11 ('soft')
+        usable_ace = self.player_hand.is_soft()
+
+        return (score, card_val, usable_ace)
+
+
+class VecBlackjackEnv:
+    """
+    Plays n_envs games of Blackjack side by side using NumPy arrays.
+
+    Same rules and rewards as BlackjackEnv.step, but every call to step()
+    takes an array of actions (one per game) and returns arrays.
+    Finished games are reset automatically, so the returned state of a
+    game that just ended is already the first state of its next game.
+    """
+    def __init__(self, n_envs, seed=None, dealer="play", hit_soft_17=False):
+        # dealer: "play", "sample" or "expected", as in BlackjackEnv
+        # seed: an int, None, or a random_streams.RandomStream to draw from
+        self.n_envs = n_envs
+        self.rng = seed.generator if hasattr(seed, "generator") else np.random.default_rng(seed)
+        self.dealer = dealer
+        self.hit_soft_17 = hit_soft_17
+        self._dealer_cdf = np.cumsum(dealer_outcome_table(hit_soft_17), axis=1)
+        self._stick_rewards = stick_reward_table(hit_soft_17)
+
+        # Player hand: total with aces counted as 1, plus "holds an ace"
+        self.player_hard = np.zeros(n_envs, dtype=np.int8)
+        self.player_ace = np.zeros(n_envs, dtype=bool)
+        # Dealer hand, stored the same way
+        self.dealer_hard = np.zeros(n_envs, dtype=np.int8)
+        self.dealer_ace = np.zeros(n_envs, dtype=bool)
+        # Dealer show card as seen in the state: 2-10, Ace = 11
+        self.dealer_card = np.zeros(n_envs, dtype=np.int8)
+
+        self.dones = np.zeros(n_envs, dtype=bool)
+
+    def _draw(self, size):
+        """Draws `size` cards (hard values, Ace = 1) from the infinite deck."""
+        return HARD_VALUES[self.rng.integers(0, 13, size)]
+
+    @staticmethod
+    def _hand_value(hard, has_ace):
+        """Best total of a hand: one ace counts as 11 if it doesn't bust us."""
+        usable = has_ace & (hard + 10 <= 21)
+        return hard + 10 * usable, usable
+
+    def _reset_envs(self, idx):
+        """Deals a fresh game (2 cards each) to the games in idx."""
+        n = len(idx)
+        p1, d1, p2, d2 = self._draw((4, n))
+
+        self.player_hard[idx] = p1 + p2
+        self.player_ace[idx] = (p1 == 1) | (p2 == 1)
+        self.dealer_hard[idx] = d1 + d2
+        self.dealer_ace[idx] = (d1 == 1) | (d2 == 1)
+        self.dealer_card[idx] = np.where(d1 == 1, 11, d1)
+
+    def reset(self):
+        """Resets every game. Returns (player_sums, dealer_cards, usable_aces)."""
+        self._reset_envs(np.arange(self.n_envs))
+        self.dones[:] = False
+        return self._get_state()
+
+    def step(self, actions):
+        """
+        actions: array of 0 (Stick) / 1 (Hit), one per game.
+        Returns: (states, rewards, dones) where states is the same tuple of
+        arrays returned by reset().
+        """
+        actions = np.asarray(actions)
+        rewards = np.zeros(self.n_envs, dtype=np.float64)
+        dones = np.zeros(self.n_envs, dtype=bool)
+
+        # --- PLAYER HITS (Action 1) ---
+        hit = np.flatnonzero(actions == 1)
+        if len(hit):
+            card = self._draw(len(hit))
+            self.player_hard[hit] += card
+            self.player_ace[hit] |= card == 1
+
+            p_val, _ = self._hand_value(self.player_hard[hit], self.player_ace[hit])
+            bust = hit[p_val > 21]
+            rewards[bust] = -1
+            dones[bust] = True
+
+        # --- PLAYER STICKS (Action 0) ---
+        stick = np.flatnonzero(actions != 1)
+        if len(stick) and self.dealer != "play":
+            p_val, _ = self._hand_value(self.player_hard[stick], self.player_ace[stick])
+            show_card = self.dealer_card[stick]
+            if self.dealer == "expected":
+                rewards[stick] = self._stick_rewards[p_val, show_card]
+            else:
+                # One categorical draw per game from its show card's row
+                u = self.rng.random(len(stick))
+                outcome = np.minimum((u[:, None] >= self._dealer_cdf[show_card]).sum(axis=1), BUST)
+                d_val = 17 + outcome
+                rewards[stick] = np.where(outcome == BUST, 1, np.sign(p_val - d_val))
+            dones[stick] = True
+        elif len(stick):
+            d_hard = self.dealer_hard[stick]
+            d_ace = self.dealer_ace[stick]
+
+            # Dealer hits until >= 17, all still-playing dealers at once
+            while True:
+                d_val, d_soft = self._hand_value(d_hard, d_ace)
+                needs_card = (d_val < 17) | (self.hit_soft_17 & (d_val == 17) & d_soft)
+                if not needs_card.any():
+                    break
+                card = self._draw(needs_card.sum())
+                d_hard[needs_card] += card
+                d_ace[needs_card] |= card == 1
+
+            p_val, _ = self._hand_value(self.player_hard[stick], self.player_ace[stick])
+
+            # Same outcome order as BlackjackEnv.step
+            rewards[stick] = np.where(d_val > 21, 1, np.sign(p_val - d_val))
+            dones[stick] = True
+
+        # Auto-reset the games that just finished
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            self._reset_envs(finished)
+
+        self.dones = dones
+        return self._get_state(), rewards, dones
+
+    def _get_state(self):
+        """
+        Same state as BlackjackEnv, one entry per game:
+        (Player Score, Dealer Show Card Value, Usable Ace)
+        """
+        score, usable = self._hand_value(self.player_hard, self.player_ace)
+        return score, self.dealer_card.copy(), usable
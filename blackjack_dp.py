@@ -0,0 +1,165 @@
+import numpy as np
+from blackjack import (CARD_PROBS, PLAYER_SUMS, STATE_SHAPE,
+                       stick_reward_table)
+
+# Exact (model-based) Blackjack values for the infinite deck.
+# Same state space as the Monte Carlo code: (Player Sum, Dealer Card, Usable Ace),
+# laid out as STATE_SHAPE arrays, and Q tables as STATE_SHAPE + (2,) like mc_control.
+# Because we know the card probabilities we don't need to sample anything:
+# a hand's hard total only ever goes up, so a few sweeps over ~400 states
+# give the exact answer.
+
+def valid_states():
+    """Mask of the states the game can actually reach (player sum 4-21, show card 2-11)."""
+    mask = np.zeros(STATE_SHAPE, dtype=bool)
+    mask[4:22, 2:12, 0] = True    # Hard hands: 2+2 up to 21
+    mask[12:22, 2:12, 1] = True   # Soft hands: A+A (12) up to 21
+    return mask
+
+def hit_transitions():
+    """
+    What a Hit does to the player's part of the state (sum, usable ace).
+    Returns (T, bust): T[p, u, p2, u2] = chance of moving to (p2, u2),
+    bust[p, u] = chance of going over 21.
+    """
+    T = np.zeros((PLAYER_SUMS, 2, PLAYER_SUMS, 2))
+    bust = np.zeros((PLAYER_SUMS, 2))
+    for player_sum in range(PLAYER_SUMS):
+        for usable in (0, 1):
+            hard = player_sum - 10 * usable
+            if hard < 2:
+                continue
+            for card in range(1, 11):
+                new_hard = hard + card
+                # A non-usable hand that holds an Ace is already hard >= 12,
+                # so only a usable Ace or a fresh Ace can count as 11 again
+                new_usable = int((usable or card == 1) and new_hard + 10 <= 21)
+                new_sum = new_hard + 10 * new_usable
+                if new_sum > 21:
+                    bust[player_sum, usable] += CARD_PROBS[card]
+                else:
+                    T[player_sum, usable, new_sum, new_usable] += CARD_PROBS[card]
+    return T, bust
+
+def _action_values(V, T, bust, R):
+    """Q(s, a) for both actions, given state values V."""
+    q_hit = np.einsum("puqv,qdv->pdu", T, V) - bust[:, None, :]
+    q_stick = np.broadcast_to(R[:, :, None], STATE_SHAPE)
+    return np.stack([q_stick, q_hit], axis=-1)
+
+def policy_table(policy):
+    """Turns a policy function state -> action into an array of actions."""
+    actions = np.zeros(STATE_SHAPE, dtype=np.int8)
+    for player_sum, dealer_card, usable in zip(*np.nonzero(valid_states())):
+        state = (int(player_sum), int(dealer_card), bool(usable))
+        actions[player_sum, dealer_card, usable] = policy(state)
+    return actions
+
+def evaluate_policy(policy, hit_soft_17=False, tol=1e-12):
+    """
+    Exact V^pi for a fixed policy (a function like simple_policy, or an
+    array of actions shaped like STATE_SHAPE). Unreachable states are NaN.
+    """
+    actions = policy if isinstance(policy, np.ndarray) else policy_table(policy)
+    T, bust = hit_transitions()
+    R = stick_reward_table(hit_soft_17)
+
+    V = np.zeros(STATE_SHAPE)
+    while True:
+        Q = _action_values(V, T, bust, R)
+        V_new = np.take_along_axis(Q, actions[..., None].astype(np.intp), axis=-1)[..., 0]
+        if np.max(np.abs(V_new - V)) < tol:
+            break
+        V = V_new
+    return np.where(valid_states(), V_new, np.nan)
+
+def solve_optimal(hit_soft_17=False, tol=1e-12):
+    """
+    Exact Q* by value iteration. Returns a Q table shaped like mc_control's
+    (STATE_SHAPE + (2,)); unreachable states are 0.
+    """
+    T, bust = hit_transitions()
+    R = stick_reward_table(hit_soft_17)
+
+    V = np.zeros(STATE_SHAPE)
+    while True:
+        Q = _action_values(V, T, bust, R)
+        V_new = Q.max(axis=-1)
+        if np.max(np.abs(V_new - V)) < tol:
+            break
+        V = V_new
+    return np.where(valid_states()[..., None], Q, 0.0)
+
+# --- Measuring Monte Carlo against the exact answer ---
+
+def value_rmse(V_est, V_true):
+    """RMSE of an estimated V table over the states it has a value for."""
+    mask = valid_states() & ~np.isnan(V_est)
+    return float(np.sqrt(np.mean((V_est[mask] - V_true[mask]) ** 2)))
+
+def policy_agreement(Q, Q_star):
+    """Fraction of states (player sum 12-21) where Q picks the same action as Q*."""
+    mask = valid_states()
+    mask[:12] = False
+    return float(np.mean(np.argmax(Q, axis=-1)[mask] == np.argmax(Q_star, axis=-1)[mask]))
+
+def mc_error_curve(policy, budgets, env=None, n_envs=4096, seed=None, batch_episodes=100_000):
+    """
+    Runs first-visit MC prediction once, reading off the RMSE against the
+    exact V^pi each time the episode count reaches a budget.
+    Returns a list of (episodes, rmse).
+
+    By default the episodes come from a VecBlackjackEnv, which deals from
+    the same infinite deck as the exact answer, so the error is pure Monte
+    Carlo noise. Pass a BlackjackEnv as `env` to measure the finite-deck
+    env instead; that curve levels off at the gap between the two models.
+    """
+    V_true = evaluate_policy(policy)
+    returns_sum = np.zeros(STATE_SHAPE)
+    returns_count = np.zeros(STATE_SHAPE, dtype=np.int64)
+
+    if env is not None:
+        from mc_predictions import accumulate_returns
+
+        def play(n):
+            accumulate_returns(env, policy, n, returns_sum, returns_count)
+    else:
+        from blackjack import NUM_STATES, VecBlackjackEnv
+        from batch_updates import VecEpisodeCollector, batch_returns
+
+        actions = (policy if isinstance(policy, np.ndarray) else policy_table(policy)).reshape(NUM_STATES)
+        collector = VecEpisodeCollector(VecBlackjackEnv(n_envs, seed=seed))
+
+        def play(n):
+            while n > 0:
+                batch = collector.collect(lambda codes: actions[codes], min(n, batch_episodes))
+                sums, counts = batch_returns(batch["states"], batch["rewards"],
+                                             batch["offsets"], NUM_STATES)
+                returns_sum.reshape(-1)[:] += sums
+                returns_count.reshape(-1)[:] += counts
+                n -= len(batch["offsets"]) - 1
+
+    from mc_predictions import compute_values
+
+    curve = []
+    done = 0
+    for budget in sorted(budgets):
+        play(budget - done)
+        done = budget
+        curve.append((budget, value_rmse(compute_values(returns_sum, returns_count), V_true)))
+    return curve
+
+if __name__ == "__main__":
+    from mc_predictions import simple_policy
+
+    V = evaluate_policy(simple_policy)
+    print(f"V(21, 10, False) under simple_policy: {V[21, 10, 0]:.4f}")
+    print(f"V(13, 5, True)  under simple_policy: {V[13, 5, 1]:.4f}")
+
+    Q_star = solve_optimal()
+    start_value = np.nanmean(np.where(valid_states(), Q_star.max(axis=-1), np.nan))
+    print(f"Mean optimal state value: {start_value:.4f}")
+
+    print("\nEpisodes | RMSE vs exact V")
+    for episodes, rmse in mc_error_curve(simple_policy, [1_000, 10_000, 100_000]):
+        print(f"{episodes:8d} | {rmse:.4f}")
@@ -1,5 +1,5 @@
-import random
 from enum import Enum
+from random_streams import DEFAULT
 
 #Enum for Suits to prevent typos and manage .
 #An Enum (short for Enumeration) is a way to define a set of named,
@@ -14,9 +14,20 @@ class Suit(Enum):
     DIAMONDS = "♦"
 
 class Card:
+    # __slots__ stops Python from giving every card its own __dict__,
+    # which makes cards smaller and attribute lookups faster.
+    __slots__ = ("rank", "suit", "_value")
+
     def __init__(self, rank, suit: Suit):
         self.rank = rank
         self.suit = suit.value
+        # Work out the value once instead of re-checking the rank string
+        if rank in ["J", "Q", "K"]:
+            self._value = 10
+        elif rank == "A":
+            self._value = 11
+        else:
+            self._value = int(rank)
 
     @property 
     #Using property we can use a method as an attribute
@@ -28,11 +39,7 @@ class Card:
 
     def value(self):
         """Returns the base value of the card."""
-        if self.rank in ["J", "Q", "K"]:
-            return 10
-        elif self.rank == "A":
-            return 11
-        return int(self.rank)
+        return self._value
 
     def get_lines(self):
         """
@@ -54,48 +61,143 @@ class Card:
     def __str__(self):
         return "\n".join(self.get_lines())
 
+RANKS = [str(n) for n in range(2, 11)] + list("JQKA")
+
+# [cite: 102] Every card that exists, built once.
+# A card is identified by a small integer code: CARD_POOL[code].
+# code = suit_index * 13 + rank_index, so code % 13 gives the rank.
+CARD_POOL = [Card(rank, suit) for suit in Suit for rank in RANKS]
+
+# Hi-Lo count tag for each rank index: 2-6 = +1, 7-9 = 0, 10-A = -1
+HI_LO = [1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, -1]
+
 class Deck:
-    def __init__(self):
-        self.cards = []
+    """
+    A 52 card deck stored as integer codes.
+
+    Nothing is rebuilt between hands: the codes live in one preallocated
+    list and a draw pointer marks how many have been dealt. Shuffling is
+    lazy (one Fisher-Yates swap per draw), so we only pay to randomize the
+    cards that actually get drawn.
+    """
+    def __init__(self, num_decks=1, rng=None):
+        # rng: a random_streams.RandomStream (default: the shared one)
+        self.rng = rng if rng is not None else DEFAULT
+        self.codes = list(range(len(CARD_POOL))) * num_decks
+        self.top = 0  # Index of the next card to deal
         self.reset()
 
     def reset(self):
         """[cite: 103] Refills the deck and shuffles."""
-        ranks = [str(n) for n in range(2, 11)] + list("JQKA")
-        # [cite: 102] Create a list of Card objects
-        self.cards = [Card(rank, suit) for suit in Suit for rank in ranks]
-        self.shuffle()
+        # Every dealt card goes back in just by rewinding the pointer.
+        # The order left behind doesn't matter: each draw below picks
+        # uniformly from the cards not dealt yet.
+        self.top = 0
 
     def shuffle(self):
-        random.shuffle(self.cards)
+        self.top = 0
+
+    def draw_code(self):
+        """Fast path: returns the integer code of the next card (or None)."""
+        top = self.top
+        codes = self.codes
+        if top >= len(codes):
+            return None
+        # Lazy shuffle: swap a random undealt card into the draw position
+        j = top + int(self.rng.random() * (len(codes) - top))
+        codes[top], codes[j] = codes[j], codes[top]
+        self.top = top + 1
+        return codes[top]
 
     def draw(self):
-        return self.cards.pop() if self.cards else None
+        code = self.draw_code()
+        return CARD_POOL[code] if code is not None else None
+
+    @property
+    def cards(self):
+        """The undealt cards (in no particular order)."""
+        return [CARD_POOL[code] for code in self.codes[self.top:]]
+
+    def __len__(self):
+        return len(self.codes) - self.top
+
+class Shoe(Deck):
+    """
+    A casino shoe of several decks dealt down to a cut card.
+
+    Unlike Deck, reset() between hands does NOT reshuffle: the shoe keeps
+    dealing until the cut card (penetration = fraction of the shoe dealt)
+    has come out, and only then starts a fresh shuffle. The remaining
+    composition and the Hi-Lo running count are updated on every draw.
+    """
+    def __init__(self, num_decks=6, penetration=0.75, rng=None):
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.cut_card = int(len(CARD_POOL) * num_decks * penetration)
+        super().__init__(num_decks, rng)
+        self.shuffle()
+
+    def reset(self):
+        """Called between hands. Reshuffles only once the cut card is out."""
+        if self.top >= self.cut_card:
+            self.shuffle()
+
+    def shuffle(self):
+        self.top = 0
+        # Cards left of each rank (index = code % 13)
+        self.remaining = [4 * self.num_decks] * len(RANKS)
+        self.running_count = 0
+
+    def draw_code(self):
+        # Should only happen with penetration close to 1.0
+        if self.top >= len(self.codes):
+            self.shuffle()
+        code = super().draw_code()
+        rank_index = code % 13
+        self.remaining[rank_index] -= 1
+        self.running_count += HI_LO[rank_index]
+        return code
+
+    @property
+    def true_count(self):
+        """Running count per deck still in the shoe."""
+        decks_left = len(self) / 52
+        return self.running_count / decks_left if decks_left else 0.0
 
 class Hand:
     def __init__(self):
         self.cards = []
+        # Running totals so we never have to rescan the cards
+        self.total = 0       # Best value of the hand
+        self.aces = 0        # Number of aces in the hand
+        self.soft_aces = 0   # Aces still counted as 11
 
     def add_card(self, card):
-        self.cards.append(card)
-
-    def get_value(self):
         """
         [cite: 107] Critical Logic: Calculate hand value.
-        Handles the Ace (1 or 11) rule dynamically.
+        Handles the Ace (1 or 11) rule as each card arrives.
         """
-        val = 0
-        aces = 0
-        for card in self.cards:
-            val += card.value
-            if card.rank == "A":
-                aces += 1
-        
+        self.cards.append(card)
+        value = card.value
+        self.total += value
+        if value == 11:
+            self.aces += 1
+            self.soft_aces += 1
+
         # Downgrade Aces from 11 to 1 if the hand is Bust (>21)
-        while val > 21 and aces > 0:
-            val -= 10
-            aces -= 1
-        return val
+        while self.total > 21 and self.soft_aces > 0:
+            self.total -= 10
+            self.soft_aces -= 1
+
+    def get_value(self):
+        return self.total
+
+    def is_soft(self):
+        """True if an Ace is currently counted as 11 (a "usable" Ace)."""
+        return self.soft_aces > 0
+
+    def is_bust(self):
+        return self.total > 21
 
     def __str__(self):
         """
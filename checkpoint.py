@@ -0,0 +1,106 @@
+import json
+import os
+import pickle
+import numpy as np
+from random_streams import DEFAULT
+
+# A checkpoint is a directory holding:
+#   <name>.<version>.npy   one file per table (Q, visit counts, ...)
+#   state.<version>.pkl    the shared random stream's state plus anything else the trainer wants back
+#   meta.json              episode index and the files that make up the checkpoint
+# Every save writes a new version of each file and only then swaps in a
+# meta.json naming them, so a crash mid-save leaves the previous checkpoint
+# whole: tables, RNG state and episode index always come from the same save.
+# The previous version stays on disk, so a reader that read meta.json just
+# before a save can still open its files; older versions are deleted.
+# Other processes (plotting, evaluation) can map the tables read-only with
+# open_tables() while training carries on; they see each checkpoint as it lands.
+
+def _fsync_replace(tmp, path):
+    with open(tmp, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _atomic_write(path, data):
+    """Writes to a temp file and renames it, so readers never see half a file."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    _fsync_replace(tmp, path)
+
+def _read_meta(directory):
+    with open(os.path.join(directory, "meta.json")) as f:
+        return json.load(f)
+
+class Checkpoint:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def exists(self):
+        return os.path.exists(self._path("meta.json"))
+
+    def save(self, episode, tables, state=None):
+        """
+        Writes every table in `tables` ({name: array}) and the RNG states
+        plus `state` to new files, then points meta.json at them.
+        """
+        old = _read_meta(self.directory) if self.exists() else None
+        version = old["version"] + 1 if old else 1
+
+        files = {}
+        for name, array in tables.items():
+            files[name] = f"{name}.{version:06d}.npy"
+            tmp = self._path(files[name] + ".tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, array)
+            _fsync_replace(tmp, self._path(files[name]))
+
+        state_file = f"state.{version:06d}.pkl"
+        blob = {"stream": DEFAULT.get_state(), "state": state}
+        _atomic_write(self._path(state_file), pickle.dumps(blob))
+
+        meta = {"episode": episode, "version": version, "tables": files, "state": state_file}
+        _atomic_write(self._path("meta.json"), json.dumps(meta, indent=2).encode())
+
+        # The new checkpoint is in. Keep version - 1 for readers that are
+        # mid-open; anything older goes
+        for filename in os.listdir(self.directory):
+            parts = filename.split(".")
+            if (len(parts) == 3 and parts[2] in ("npy", "pkl") and parts[1].isdigit()
+                    and int(parts[1]) < version - 1):
+                try:
+                    os.remove(self._path(filename))
+                except OSError:
+                    pass  # Still mapped by a reader (Windows); the next save retries
+
+    def load(self, tables):
+        """
+        Copies the saved tables into the arrays in `tables` ({name: array})
+        and restores the RNG states. Returns (episode, state).
+        """
+        meta = _read_meta(self.directory)
+        for name, array in tables.items():
+            array[...] = np.load(self._path(meta["tables"][name]), mmap_mode="r")
+
+        with open(self._path(meta["state"]), "rb") as f:
+            blob = pickle.load(f)
+        DEFAULT.set_state(blob["stream"])
+        return meta["episode"], blob["state"]
+
+def open_tables(directory):
+    """
+    Read-only memory-mapped views of a checkpoint's tables (no copies).
+    Returns ({name: array}, episode).
+    """
+    while True:
+        meta = _read_meta(directory)
+        try:
+            tables = {name: np.load(os.path.join(directory, filename), mmap_mode="r")
+                      for name, filename in meta["tables"].items()}
+        except FileNotFoundError:
+            continue  # Two saves landed since meta.json was read; read it again
+        return tables, meta["episode"]
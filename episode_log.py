@@ -0,0 +1,132 @@
+import glob
+import os
+import numpy as np
+from blackjack import encode_state, decode_state
+
+# Columnar episode store: a directory of .npz chunks, each holding
+#   states    int16    encoded state of every step (blackjack.encode_state)
+#   actions   int8     action taken at that step
+#   rewards   float32  reward received after it (fractional with dealer="expected")
+#   probs     float32  chance the behaviour policy had of taking that action
+#   offsets   int64    where each episode starts; offsets[-1] = number of steps
+# so episode k is rows offsets[k]:offsets[k + 1] of every column.
+
+def segment_suffix_sums(x, offsets):
+    """
+    out[..., t] = x[..., t] + x[..., t+1] + ... up to the end of t's episode.
+    x may have extra leading axes (one row per candidate policy).
+    """
+    n = x.shape[-1]
+    pad = np.zeros(x.shape[:-1] + (1,))
+    c = np.concatenate([pad, np.cumsum(x, axis=-1)], axis=-1)   # c[t] = sum of x[:t]
+    ends = np.repeat(offsets[1:], np.diff(offsets))             # End of each step's episode
+    return c[..., ends] - c[..., :n]
+
+class EpisodeWriter:
+    """
+    Collects episodes in memory and writes them out one large chunk at a
+    time. Use as a context manager (or call close()) so the last partial
+    chunk gets written.
+    """
+    def __init__(self, directory, chunk_steps=1_000_000):
+        self.directory = directory
+        self.chunk_steps = chunk_steps
+        os.makedirs(directory, exist_ok=True)
+        self.n_chunks = len(glob.glob(os.path.join(directory, "episodes-*.npz")))
+        self._reset_buffers()
+
+    def _reset_buffers(self):
+        self.states = []
+        self.actions = []
+        self.rewards = []
+        self.probs = []
+        self.offsets = [0]
+
+    def add_episode(self, episode, probs=None):
+        """
+        episode: list of (state, action, reward) as returned by generate_episode.
+        probs: behaviour probability of each action (default 1.0, a fixed policy).
+        """
+        for state, action, reward in episode:
+            self.states.append(encode_state(state))
+            self.actions.append(action)
+            self.rewards.append(reward)
+        self.probs.extend(probs if probs is not None else [1.0] * len(episode))
+        self.offsets.append(len(self.states))
+
+        if len(self.states) >= self.chunk_steps:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered episodes as one chunk."""
+        if len(self.offsets) == 1:
+            return
+        path = os.path.join(self.directory, f"episodes-{self.n_chunks:05d}.npz")
+        np.savez(path,
+                 states=np.array(self.states, dtype=np.int16),
+                 actions=np.array(self.actions, dtype=np.int8),
+                 rewards=np.array(self.rewards, dtype=np.float32),
+                 probs=np.array(self.probs, dtype=np.float32),
+                 offsets=np.array(self.offsets, dtype=np.int64))
+        self.n_chunks += 1
+        self._reset_buffers()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class EpisodeReader:
+    """Streams a store back, one chunk in memory at a time."""
+    def __init__(self, directory):
+        self.paths = sorted(glob.glob(os.path.join(directory, "episodes-*.npz")))
+
+    def chunks(self):
+        """Yields each chunk as a dict of column arrays."""
+        for path in self.paths:
+            with np.load(path) as data:
+                yield {name: data[name] for name in data.files}
+
+    def episodes(self):
+        """
+        Yields every stored episode in generate_episode's format:
+        [(state, action, reward), ...]
+        """
+        for chunk in self.chunks():
+            states = [decode_state(code) for code in chunk["states"].tolist()]
+            actions = chunk["actions"].tolist()
+            rewards = chunk["rewards"].tolist()
+            offsets = chunk["offsets"].tolist()
+            for start, stop in zip(offsets[:-1], offsets[1:]):
+                yield list(zip(states[start:stop], actions[start:stop], rewards[start:stop]))
+
+    def load(self):
+        """Every chunk glued into one set of columns (offsets re-based)."""
+        chunks = list(self.chunks())
+        if not chunks:
+            empty = {"states": np.int16, "actions": np.int8, "rewards": np.float32, "probs": np.float32}
+            columns = {name: np.zeros(0, dtype=dtype) for name, dtype in empty.items()}
+            columns["offsets"] = np.zeros(1, dtype=np.int64)
+            return columns
+
+        columns = {name: np.concatenate([c[name] for c in chunks])
+                   for name in ("states", "actions", "rewards", "probs")}
+        offsets = [np.zeros(1, dtype=np.int64)]
+        base = 0
+        for c in chunks:
+            offsets.append(c["offsets"][1:] + base)
+            base += c["offsets"][-1]
+        columns["offsets"] = np.concatenate(offsets)
+        return columns
+
+    def __len__(self):
+        """Number of stored episodes."""
+        total = 0
+        for path in self.paths:
+            with np.load(path) as data:
+                total += len(data["offsets"]) - 1
+        return total
@@ -0,0 +1,214 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use("Agg")  # Sweeps run headless: every plot goes to a file
+import numpy as np
+
+import GamblersRuin
+import MonteCarlo
+import mc_control
+import mc_predictions
+from blackjack_dp import evaluate_policy, policy_agreement, solve_optimal, value_rmse
+from random_streams import seed_all
+
+# Hyperparameter sweeps without editing code.
+# A sweep is a list of experiments; each names a kind, a grid of parameters
+# and a list of seeds, and expands into one run per (grid point, seed):
+#
+#   {"experiments": [
+#       {"kind": "mc_control", "seeds": [0, 1],
+#        "grid": {"num_episodes": [200000], "epsilon": [0.05, 0.1], "alpha": [0.01, 0.02]}},
+#       {"kind": "estimator", "seeds": [0],
+#        "grid": {"name": ["circle", "e_magic"], "max_n": [1000000]}}
+#   ]}
+#
+# Runs go to a process pool. Each result is cached on disk under a hash of
+# its config (seed included): <cache>/<key>.npz holds the arrays (Q tables,
+# curves), <key>.json the config, timing, summary numbers and plot files.
+# The .json is written last, so a run only counts as done once it exists,
+# and rerunning a sweep (or an interrupted one) skips every finished run.
+#
+#   python experiments.py sweep.json --workers 4
+#   python experiments.py                         # the DEFAULT_SWEEP below
+
+DEFAULT_SWEEP = {"experiments": [
+    {"kind": "mc_control", "seeds": [0],
+     "grid": {"num_episodes": [100_000], "epsilon": [0.05, 0.1], "alpha": [0.01, 0.02]}},
+    {"kind": "mc_prediction", "seeds": [0],
+     "grid": {"num_episodes": [100_000]}},
+    {"kind": "estimator", "seeds": [0, 1],
+     "grid": {"name": ["circle", "parabola", "gaussian", "e_area", "e_magic"],
+              "max_n": [10**6], "sampler": ["uniform", "sobol"]}},
+    {"kind": "gamblers_ruin", "seeds": [0],
+     "grid": {"p_win": [0.5, 0.49], "n_gam": [10_000], "rounds": [1000]}},
+]}
+
+# --- Experiment Kinds ---
+# Each takes (config, plot_prefix) and returns (arrays, summary): arrays go
+# to the .npz, summary (plain numbers) to the .json. plot_prefix is None
+# when plots are off.
+
+def run_mc_control(cfg, plot_prefix):
+    # Trains on the infinite deck (VecBlackjackEnv), the same model solve_optimal
+    # solves, so policy_agreement measures learning error and nothing else
+    Q, rewards = mc_control.train_mc_control_vec(cfg["num_episodes"],
+                                                 epsilon=cfg.get("epsilon", mc_control.EPSILON),
+                                                 alpha=cfg.get("alpha", mc_control.ALPHA),
+                                                 seed=cfg["seed"])
+    if plot_prefix:
+        mc_control.plot_learning_curve(rewards, save_path=plot_prefix + "-curve.png")
+        mc_control.plot_strategy_card(Q, save_path=plot_prefix + "-strategy.png")
+    episodes, means = rewards.curve_points()
+    arrays = {"Q": Q, "curve_episodes": episodes, "curve_means": means}
+    summary = {"recent_mean_reward": float(rewards.recent_mean),
+               "policy_agreement": policy_agreement(Q, solve_optimal())}
+    return arrays, summary
+
+def run_mc_prediction(cfg, plot_prefix):
+    V, counts = mc_predictions.mc_prediction_vec(cfg["num_episodes"], mc_predictions.simple_policy,
+                                                 first_visit=cfg.get("first_visit", True),
+                                                 seed=cfg["seed"])
+    summary = {"value_rmse": value_rmse(V, evaluate_policy(mc_predictions.simple_policy))}
+    return {"V": V, "counts": counts}, summary
+
+def run_estimator(cfg, plot_prefix):
+    ns = np.unique(np.logspace(1, np.log10(cfg["max_n"]), num=cfg.get("num_points", 20)).astype(np.int64))
+    estimates = MonteCarlo.convergence_curve(cfg["name"], ns, sampler=cfg.get("sampler", "uniform"))
+    if plot_prefix:
+        MonteCarlo.plot_convergence(cfg["name"], ns, estimates, save_path=plot_prefix + "-convergence.png")
+    truth = MonteCarlo.CONVERGENCE_ESTIMATORS[cfg["name"]][2]
+    summary = {"estimate": float(estimates[-1]),
+               "percent_error": float(abs(estimates[-1] - truth) / truth * 100)}
+    return {"ns": ns, "estimates": estimates}, summary
+
+def run_gamblers_ruin(cfg, plot_prefix):
+    params = {k: cfg[k] for k in ("n_gam", "rounds", "start", "p_win", "stake") if k in cfg}
+    result = GamblersRuin.simulate_ruin(keep_paths=100 if plot_prefix else 0, **params)
+    if plot_prefix:
+        GamblersRuin.plot_ruin(result, save_path=plot_prefix + "-ruin.png")
+    arrays = {"ruin_times": result.ruin_times, "wealth_values": result.wealth_values,
+              "wealth_counts": result.wealth_counts, "mean_path": result.mean_path}
+    summary = {"ruin_probability": float(result.ruin_probability), "stderr": float(result.stderr)}
+    return arrays, summary
+
+KINDS = {
+    "mc_control": run_mc_control,
+    "mc_prediction": run_mc_prediction,
+    "estimator": run_estimator,
+    "gamblers_ruin": run_gamblers_ruin,
+}
+
+# --- Sweep ---
+
+def expand(sweep):
+    """Every run in the sweep, as a flat config dict (kind, seed and parameters)."""
+    configs = []
+    for exp in sweep["experiments"]:
+        if exp["kind"] not in KINDS:
+            raise ValueError(f"Unknown kind {exp['kind']!r}; choose from {sorted(KINDS)}")
+        grid = exp.get("grid", {})
+        for values in itertools.product(*grid.values()):
+            for seed in exp.get("seeds", [0]):
+                configs.append({"kind": exp["kind"], "seed": seed, **dict(zip(grid, values))})
+    return configs
+
+def config_key(cfg):
+    """Cache key: a hash of the config, seed included."""
+    blob = json.dumps(cfg, sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+def load_result(cache_dir, key):
+    """(arrays, info) for a cached run, or None if it hasn't finished."""
+    meta = os.path.join(cache_dir, key + ".json")
+    if not os.path.exists(meta):
+        return None
+    with open(meta) as f:
+        info = json.load(f)
+    with np.load(os.path.join(cache_dir, key + ".npz")) as data:
+        arrays = dict(data)
+    return arrays, info
+
+def run_one(args):
+    """Runs in a worker process: one config, written to the cache. Returns its .json info."""
+    cfg, cache_dir, plot_dir = args
+    key = config_key(cfg)
+    plot_prefix = os.path.join(plot_dir, f"{cfg['kind']}-{key}") if plot_dir else None
+
+    seed_all(cfg["seed"])
+    start = time.perf_counter()
+    # The learners print progress; keep the sweep output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        arrays, summary = KINDS[cfg["kind"]](cfg, plot_prefix)
+    seconds = time.perf_counter() - start
+
+    plots = sorted(os.path.join(plot_dir, f) for f in os.listdir(plot_dir)
+                   if f.startswith(f"{cfg['kind']}-{key}")) if plot_dir else []
+    info = {"key": key, "config": cfg, "seconds": seconds, "summary": summary, "plots": plots}
+
+    # Arrays first, .json last: the .json marks the run as finished
+    tmp = os.path.join(cache_dir, key + ".tmp.npz")
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, os.path.join(cache_dir, key + ".npz"))
+    tmp = os.path.join(cache_dir, key + ".json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(info, f, indent=2)
+    os.replace(tmp, os.path.join(cache_dir, key + ".json"))
+    return info
+
+def run_sweep(sweep, cache_dir="experiment_cache", plot_dir="experiment_plots", n_workers=None):
+    """
+    Runs every config of the sweep that isn't cached yet, across a process
+    pool. Returns the .json info of every config (cached or new), in sweep order.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    if plot_dir:
+        os.makedirs(plot_dir, exist_ok=True)
+
+    configs = expand(sweep)
+    infos = {}
+    todo = []
+    for cfg in configs:
+        cached = load_result(cache_dir, config_key(cfg))
+        if cached is not None:
+            infos[config_key(cfg)] = cached[1]
+        else:
+            todo.append(cfg)
+    print(f"{len(configs)} runs: {len(configs) - len(todo)} cached, {len(todo)} to do")
+
+    with ProcessPoolExecutor(max_workers=n_workers or os.cpu_count()) as pool:
+        futures = [pool.submit(run_one, (cfg, cache_dir, plot_dir)) for cfg in todo]
+        for future in as_completed(futures):
+            info = future.result()
+            infos[info["key"]] = info
+            print(f"  done {info['config']} in {info['seconds']:.1f}s: {info['summary']}")
+
+    return [infos[config_key(cfg)] for cfg in configs]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a cached hyperparameter sweep.")
+    parser.add_argument("sweep", nargs="?", help="sweep JSON file (default: DEFAULT_SWEEP)")
+    parser.add_argument("--cache", default="experiment_cache", help="result cache directory")
+    parser.add_argument("--plots", default="experiment_plots", help="plot directory ('' for no plots)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    sweep = DEFAULT_SWEEP
+    if args.sweep:
+        with open(args.sweep) as f:
+            sweep = json.load(f)
+
+    for info in run_sweep(sweep, args.cache, args.plots or None, args.workers):
+        print(f"{info['key']}  {json.dumps(info['config'])}  {json.dumps(info['summary'])}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
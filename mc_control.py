@@ -1,29 +1,40 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from collections import defaultdict
-from blackjack import BlackjackEnv
+from blackjack import BlackjackEnv, VecBlackjackEnv, STATE_SHAPE, NUM_STATES, encode_state
+from batch_updates import VecEpisodeCollector, batch_returns, apply_constant_alpha
+from metrics import RewardRecorder
+from checkpoint import Checkpoint
+from plotting import show_or_save
+from random_streams import DEFAULT as stream, seed_all
 
 # --- Configuration ---
 NUM_EPISODES = 500_000  
 EPSILON = 0.05           # Exploration rate (10% random moves)
 ALPHA = 0.01          # Learning rate (Small step size for stability)
 GAMMA = 1.0           # Discount factor (No discounting needed for Blackjack)
-#Q is not an array. It is a Dictionary (Hash Map).
-#for every state array is stores an array [q_stick, q_hit]
+#Q is one dense NumPy array: Q[player_sum, dealer_card, usable_ace, action].
 #The variable state looks like this: (16, 10, False).
+#encode_state turns it into a single row number of Q.reshape(-1, 2),
+#which holds [q_stick, q_hit] for that state.
+
+def new_q_table():
+    """Q(s, a) = 0 for every state and action."""
+    return np.zeros(STATE_SHAPE + (2,))
 
 def get_best_action(Q, state):
     """
     Returns the action with the highest Q-value for a given state.
     If values are equal (e.g., all zeros), returns a random action.
     """
-    # Q[state] is a numpy array [q_stick, q_hit]
     # We break ties randomly to encourage initial exploration
-    values = Q[state] #Q[state] returns a list of two numbers: [Value_of_Stick, Value_of_Hit].
-    if values[0] == values[1]:
-        return np.random.choice([0, 1])
-    return np.argmax(values)
+    q_stick, q_hit = Q.reshape(NUM_STATES, 2)[encode_state(state)]
+    if q_stick == q_hit:
+        return stream.coin()
+    return int(q_hit > q_stick)
 
 def epsilon_greedy_policy(Q, state, epsilon):
     """
@@ -31,89 +42,284 @@ def epsilon_greedy_policy(Q, state, epsilon):
     With prob epsilon: Random Action.
     With prob 1-epsilon: Best Action (Greedy).
     """
-    if np.random.random() < epsilon:
-        return np.random.choice([0, 1])
+    # Numbers come from pre-drawn blocks (random_streams.py), not one NumPy call each
+    if stream.random() < epsilon:
+        return stream.coin()
     else:
         return get_best_action(Q, state)
 
-def generate_episode(env, Q, epsilon):
+def action_probability(Q, state, action, epsilon):
+    """Chance that epsilon_greedy_policy picks `action` in `state`."""
+    q_stick, q_hit = Q.reshape(NUM_STATES, 2)[encode_state(state)]
+    if q_stick == q_hit:
+        return 0.5
+    greedy = int(q_hit > q_stick)
+    return 1 - epsilon / 2 if action == greedy else epsilon / 2
+
+def generate_episode(env, Q, epsilon, profiler=None, log=None):
     """
     Plays one full game using the epsilon-greedy policy.
     Returns: List of (state, action, reward)
+    With an episode_log.EpisodeWriter as `log`, the episode (and the
+    behaviour probability of each action) is also written to the log.
     """
-    episode = []
-    state = env.reset()
-    done = False
-    
-    while not done:
-        action = epsilon_greedy_policy(Q, state, epsilon)
-        next_state, reward, done = env.step(action)
-        episode.append((state, action, reward))
-        state = next_state
+    if profiler is not None:
+        episode = profiler.play_episode(env, lambda state: epsilon_greedy_policy(Q, state, epsilon))
+    else:
+        episode = []
+        state = env.reset()
+        done = False
         
+        while not done:
+            action = epsilon_greedy_policy(Q, state, epsilon)
+            next_state, reward, done = env.step(action)
+            episode.append((state, action, reward))
+            state = next_state
+
+    if log is not None:
+        log.add_episode(episode, [action_probability(Q, state, action, epsilon)
+                                  for state, action, _ in episode])
     return episode
 
-def train_mc_control(env, num_episodes):
+def update_q(Q_flat, N_flat, episode, alpha=ALPHA):
+    """
+    First-visit constant-alpha update of Q from one finished episode.
+    Q_flat / N_flat are the (NUM_STATES, 2) views of Q and the visit counts.
+    Returns the episode return G.
+    """
+    # Since Blackjack is episodic and reward is only at the end, 
+    # G is the same for every step in the episode.
+    G = episode[-1][2] 
+    
+    visited_in_episode = set()
+    
+    for state, action, reward in episode:
+        s = encode_state(state)
+        state_action_pair = s * 2 + action
+        
+        # First-Visit Check (Standard MC stability)
+        if state_action_pair not in visited_in_episode:
+            visited_in_episode.add(state_action_pair)
+            
+            # Update Q(s,a) using incremental mean
+            # Q_new = Q_old + alpha * (Target - Q_old)
+            old_val = Q_flat[s, action]
+            Q_flat[s, action] = old_val + alpha * (G - old_val)
+            N_flat[s, action] += 1
+    return G
+
+def train_mc_control(env, num_episodes, checkpoint_dir=None, checkpoint_every=100_000,
+                     profiler=None, epsilon=EPSILON, alpha=ALPHA):
+    """
+    epsilon / alpha default to the module settings above.
+    With checkpoint_dir set, Q, the visit counts, the RNG states and the
+    learning curve are saved every checkpoint_every episodes (see
+    checkpoint.py), and a run pointed at an existing checkpoint resumes
+    where it stopped.
+    Pass a profiling.TrainingProfiler as `profiler` to time each phase.
+    """
     # 1. Initialize Q(s, a) arbitrarily
-    # We use a defaultdict that returns [0.0, 0.0] for any new state
-    Q = defaultdict(lambda: np.zeros(2))
+    # Every state starts at [0.0, 0.0]; Q_flat is a view with one row per state
+    Q = new_q_table()
+    Q_flat = Q.reshape(NUM_STATES, 2)
+    N = np.zeros_like(Q)  # Visit counts per (state, action)
+    N_flat = N.reshape(NUM_STATES, 2)
     
-    # Track rewards for the Learning Curve
-    all_rewards = []
+    # Track rewards for the Learning Curve (constant memory, see metrics.py)
+    all_rewards = RewardRecorder()
+    
+    # 2. Resume from a checkpoint if there is one
+    start = 1
+    ckpt = Checkpoint(checkpoint_dir) if checkpoint_dir is not None else None
+    if ckpt is not None and ckpt.exists():
+        done, state = ckpt.load({"Q": Q, "N": N})
+        all_rewards, env.deck = state["rewards"], state["deck"]
+        start = done + 1
+        print(f"Resuming from checkpoint at episode {done}...")
     
     print(f"Starting training for {num_episodes} episodes...")
     
     # 3. The Loop
-    for i in range(1, num_episodes + 1):
+    for i in range(start, num_episodes + 1):
         # A. Generate an episode
-        episode = generate_episode(env, Q, EPSILON)
+        episode = generate_episode(env, Q, epsilon, profiler)
         
         # B. Calculate Returns & Update Q
-        # Since Blackjack is episodic and reward is only at the end, 
-        # G is the same for every step in the episode.
-        G = episode[-1][2] 
-        all_rewards.append(G)
-        
-        visited_in_episode = set()
-        
-        for state, action, reward in episode:
-            state_action_pair = (state, action)
-            
-            # First-Visit Check (Standard MC stability)
-            if state_action_pair not in visited_in_episode:
-                visited_in_episode.add(state_action_pair)
-                
-                # C. Update Q(s,a) using incremental mean
-                # Q_new = Q_old + alpha * (Target - Q_old)
-                old_val = Q[state][action]
-                Q[state][action] = old_val + ALPHA * (G - old_val)
+        if profiler is None:
+            G = update_q(Q_flat, N_flat, episode, alpha)
+        else:
+            G = profiler.timed("update", update_q, Q_flat, N_flat, episode, alpha)
+        all_rewards.record(G)
         
         # Progress Log
         if i % 50_000 == 0:
-            avg_r = np.mean(all_rewards[-1000:])
-            print(f"Episode {i}/{num_episodes} | Avg Reward (Last 1k): {avg_r:.4f}")
+            avg_r = all_rewards.recent_mean
+            speed = f" | {profiler.log_progress(i):,.0f} eps/sec" if profiler is not None else ""
+            print(f"Episode {i}/{num_episodes} | Avg Reward (Last 1k): {avg_r:.4f}{speed}")
+
+        if ckpt is not None and (i % checkpoint_every == 0 or i == num_episodes):
+            ckpt.save(i, {"Q": Q, "N": N}, state={"rewards": all_rewards, "deck": env.deck})
 
     return Q, all_rewards
 
+# --- Batched Training ---
+# Pairs VecBlackjackEnv with the batch update path in batch_updates.py:
+# thousands of games step together, and Q is updated once per batch of
+# finished episodes with bincount instead of per step in Python.
+
+def train_mc_control_vec(num_episodes, n_envs=4096, batch_episodes=10_000,
+                         epsilon=EPSILON, alpha=ALPHA, first_visit=True, seed=None):
+    """
+    Same job as train_mc_control on a VecBlackjackEnv.
+    Returns (Q, all_rewards) like train_mc_control.
+    """
+    rng = np.random.default_rng(seed)
+    collector = VecEpisodeCollector(VecBlackjackEnv(n_envs, seed=rng.integers(2**32)))
+    Q = new_q_table()
+    Q_flat = Q.reshape(-1)  # One cell per (state, action): code = state * 2 + action
+    all_rewards = RewardRecorder()
+
+    def choose_actions(codes):
+        # Epsilon-greedy for every game at once, ties broken at random
+        q = Q_flat.reshape(NUM_STATES, 2)[codes]
+        greedy = np.where(q[:, 0] == q[:, 1], rng.integers(0, 2, len(codes)),
+                          q[:, 1] > q[:, 0])
+        explore = rng.random(len(codes)) < epsilon
+        return np.where(explore, rng.integers(0, 2, len(codes)), greedy)
+
+    print(f"Starting batched training for {num_episodes} episodes on {n_envs} games...")
+
+    done = 0
+    next_log = 50_000
+    while done < num_episodes:
+        batch = collector.collect(choose_actions, min(batch_episodes, num_episodes - done))
+        pairs = batch["states"] * 2 + batch["actions"]
+        sums, counts = batch_returns(pairs, batch["rewards"], batch["offsets"],
+                                     NUM_STATES * 2, first_visit)
+        apply_constant_alpha(Q_flat, sums, counts, alpha)
+
+        all_rewards.record_batch(batch["rewards"][batch["offsets"][1:] - 1])
+        done += len(batch["offsets"]) - 1
+        if done >= next_log:
+            print(f"Episode {done}/{num_episodes} | Avg Reward (Last 1k): {all_rewards.recent_mean:.4f}")
+            next_log += 50_000
+
+    return Q, all_rewards
+
+# --- Parallel Training ---
+# Each worker process plays its own games from a copy of Q, with its own
+# seed. Every `sync_every` episodes the copies are merged back into one
+# table (periodic averaging) and handed out again.
+
+def _train_worker(args):
+    """Runs in a worker process. Returns (Q, visit counts, rewards)."""
+    Q, num_episodes, epsilon, alpha, seed = args
+    seed_all(seed)  # Deck shuffle and policy both draw from the shared stream
+
+    env = BlackjackEnv()
+    Q_flat = Q.reshape(NUM_STATES, 2)
+    N_flat = np.zeros_like(Q_flat)
+    rewards = np.empty(num_episodes, dtype=np.int8)
+    for i in range(num_episodes):
+        episode = generate_episode(env, Q, epsilon)
+        rewards[i] = update_q(Q_flat, N_flat, episode, alpha)
+    return Q, N_flat.reshape(Q.shape), rewards
+
+def merge_q_tables(Q, Qs, Ns):
+    """
+    Averages the worker tables, weighting each Q(s,a) by how often that
+    worker visited (s,a). Pairs nobody visited keep their value from Q.
+    """
+    N_total = sum(Ns)
+    weighted = sum(Q_w * N_w for Q_w, N_w in zip(Qs, Ns))
+    merged = np.where(N_total > 0, weighted / np.maximum(N_total, 1), Q)
+    return merged, N_total
+
+def train_mc_control_parallel(num_episodes, n_workers=None, sync_every=50_000,
+                              seed=None, epsilon=EPSILON, alpha=ALPHA):
+    """
+    Same job as train_mc_control, spread over n_workers processes.
+    Returns (Q, all_rewards) like train_mc_control.
+    """
+    n_workers = n_workers or os.cpu_count()
+    seeds = np.random.SeedSequence(seed)
+
+    Q = new_q_table()
+    all_rewards = RewardRecorder()
+
+    print(f"Starting parallel training for {num_episodes} episodes on {n_workers} workers...")
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        done = 0
+        while done < num_episodes:
+            # Split this round's episodes as evenly as possible
+            round_size = min(sync_every * n_workers, num_episodes - done)
+            shares = [round_size // n_workers + (w < round_size % n_workers)
+                      for w in range(n_workers)]
+            jobs = [(Q, share, epsilon, alpha, child)
+                    for share, child in zip(shares, seeds.spawn(n_workers))
+                    if share > 0]
+
+            results = list(pool.map(_train_worker, jobs))
+            Q, _ = merge_q_tables(Q, [r[0] for r in results], [r[1] for r in results])
+            for r in results:
+                all_rewards.record_batch(r[2])
+
+            done += round_size
+            avg_r = all_rewards.recent_mean
+            print(f"Episode {done}/{num_episodes} | Avg Reward (Last 1k): {avg_r:.4f}")
+
+    return Q, all_rewards
+
+def scaling_report(num_episodes=200_000, worker_counts=None, seed=0):
+    """
+    Times train_mc_control_parallel for several worker counts and prints
+    episodes/sec for each. Returns {n_workers: episodes_per_sec}.
+    """
+    if worker_counts is None:
+        cpus = os.cpu_count()
+        worker_counts = [w for w in (1, 2, 4, 8, 16, 32) if w <= cpus]
+
+    report = {}
+    for n_workers in worker_counts:
+        start = time.perf_counter()
+        train_mc_control_parallel(num_episodes, n_workers=n_workers, seed=seed,
+                                  sync_every=max(1, num_episodes // (4 * n_workers)))
+        elapsed = time.perf_counter() - start
+        report[n_workers] = num_episodes / elapsed
+
+    print("\nWorkers | Episodes/sec | Speedup")
+    for n_workers, eps in report.items():
+        print(f"{n_workers:7d} | {eps:12,.0f} | {eps / report[worker_counts[0]]:6.2f}x")
+    return report
+
 # --- Visualization Functions ---
+# Each plot shows on screen, or with save_path set is written to that file
+# (see plotting.show_or_save)
 
-def plot_learning_curve(rewards, window=5000):
+def plot_learning_curve(rewards, window=5000, save_path=None):
     """
     Task 3.1: Plot 'Rolling Average Reward'
+    rewards is a RewardRecorder (from training) or a plain list of returns.
     """
-    # Calculate rolling average using convolution for speed
-    rolling_avg = np.convolve(rewards, np.ones(window)/window, mode='valid')
-    
     plt.figure(figsize=(10, 5))
-    plt.plot(rolling_avg, color='blue', label=f'Rolling Avg (Window={window})')
+    if isinstance(rewards, RewardRecorder):
+        # Already downsampled: each point is the mean of one bucket of episodes
+        episodes, means = rewards.curve_points()
+        plt.plot(episodes, means, color='blue',
+                 label=f'Mean Reward per {rewards.bucket} Episodes')
+    else:
+        # Calculate rolling average using convolution for speed
+        rolling_avg = np.convolve(rewards, np.ones(window)/window, mode='valid')
+        plt.plot(rolling_avg, color='blue', label=f'Rolling Avg (Window={window})')
     plt.title("Learning Curve: Agent Performance Over Time")
     plt.xlabel("Episodes")
     plt.ylabel("Average Reward")
     plt.legend()
     plt.grid(True, alpha=0.3)
-    plt.show()
+    show_or_save(save_path)
 
-def plot_strategy_card(Q):
+def plot_strategy_card(Q, save_path=None):
     """
     Task 3.2: Heatmap of Optimal Actions
     X-axis: Dealer Showing Card (2-11)
@@ -126,14 +332,9 @@ def plot_strategy_card(Q):
     # We need two grids: One for "Usable Ace" (Soft), One for "No Usable Ace" (Hard)
     
     def get_grid(usable_ace):
-        grid = np.zeros((len(player_range), len(dealer_range)))
-        for i, player in enumerate(player_range):
-            for j, dealer in enumerate(dealer_range):
-                state = (player, dealer, usable_ace)
-                # Optimal action is max of Q-values
-                action = np.argmax(Q[state]) 
-                grid[i, j] = action
-        return grid
+        # Optimal action is max of Q-values, taken over the whole table at once
+        best_actions = np.argmax(Q, axis=-1)
+        return best_actions[21:11:-1, 2:12, int(usable_ace)]
 
     # Create plots
     fig, axes = plt.subplots(1, 2, figsize=(15, 6))
@@ -153,7 +354,7 @@ def plot_strategy_card(Q):
     axes[1].set_ylabel("Player Sum")
     
     plt.tight_layout()
-    plt.show()
+    show_or_save(save_path)
 
 # --- Main Execution ---
 if __name__ == "__main__":
@@ -1,6 +1,11 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from collections import defaultdict
-from blackjack import BlackjackEnv
+from blackjack import BlackjackEnv, VecBlackjackEnv, STATE_SHAPE, NUM_STATES, encode_state
+from batch_updates import VecEpisodeCollector, batch_returns
+from checkpoint import Checkpoint
+from random_streams import seed_all
 
 # 1. The Fixed Policy
 def simple_policy(state):
@@ -15,61 +20,201 @@ def simple_policy(state):
         return 1 # Hit
 
 # 2. Episode Generator
-def generate_episode(env, policy):
+def generate_episode(env, policy, profiler=None, log=None):
     """
     Plays one full game and returns the history:
     [(state, action, reward), (state, action, reward), ...]
+    With an episode_log.EpisodeWriter as `log`, the episode is also stored.
     """
-    episode = []
-    state = env.reset() #env is what is returned from blackjack.py that is ((score(some of values till now), card_val(value of card of dealer), has_ace)
+    if profiler is not None:
+        episode = profiler.play_episode(env, policy)
+    else:
+        episode = []
+        state = env.reset() #env is what is returned from blackjack.py that is ((score(some of values till now), card_val(value of card of dealer), has_ace)
 
-    done = False
-    
-    while not done:
-        action = policy(state)
-        next_state, reward, done = env.step(action)
-        episode.append((state, action, reward))
-        state = next_state
+        done = False
         
+        while not done:
+            action = policy(state)
+            next_state, reward, done = env.step(action)
+            episode.append((state, action, reward))
+            state = next_state
+
+    if log is not None:
+        log.add_episode(episode)  # A fixed policy: every action had probability 1
     return episode
 
 # 3. First-Visit Monte Carlo Algorithm
-def mc_prediction(env, num_episodes, policy):
-    # Dictionaries to store sum of returns and count of visits
-    returns_sum = defaultdict(float)  #stores how much reward is earned over all the episode from a particular state
-    returns_count = defaultdict(float) #stores how many times a particular state has been visited
+def add_first_visit_returns(sum_flat, count_flat, episode):
+    """Adds one episode's first-visit return to every state it passed through."""
+    # In Blackjack, reward is only at the end, so G is the same for all steps
+    # G = Final Reward (-1, 0, or +1)
+    G = episode[-1][2] 
+    
+    # We need to track states we've already counted this episode
+    visited_states = set()
+    #A Python set is a collection that cannot have duplicates. We use it as a "Checklist" for the current episode.
+    
+    for step in episode:
+        s = encode_state(step[0])
+        
+        # If this is the FIRST time seeing this state in this episode...
+        if s not in visited_states:
+            visited_states.add(s)
+            sum_flat[s] += G
+            count_flat[s] += 1
+
+def accumulate_returns(env, policy, num_episodes, returns_sum, returns_count, profiler=None,
+                       log=None):
+    """
+    Plays num_episodes games and adds their first-visit returns into the
+    dense returns_sum / returns_count arrays (shape STATE_SHAPE) in place.
+    """
+    # Flat views: one cell per encoded state
+    sum_flat = returns_sum.reshape(NUM_STATES)     #stores how much reward is earned over all the episode from a particular state
+    count_flat = returns_count.reshape(NUM_STATES) #stores how many times a particular state has been visited
     #here a state is Player_Sum, Dealer_Card, Usable_Ace
-    V = defaultdict(float) # The Value Function (Average)
-    #The actual averages (sum / count).
-    print(f"Running MC Prediction for {num_episodes} episodes...")
 
     for i in range(num_episodes):
         # A. Generate an episode
-        episode = generate_episode(env, policy)
+        episode = generate_episode(env, policy, profiler, log)
         
-        # B. Calculate Returns (G)
-        # In Blackjack, reward is only at the end, so G is the same for all steps
-        # G = Final Reward (-1, 0, or +1)
-        G = episode[-1][2] 
-        
-        # C. First-Visit Check
-        # We need to track states we've already counted this episode
-        visited_states = set()
-        #A Python set is a collection that cannot have duplicates. We use it as a "Checklist" for the current episode.
-        
-        for step in episode:
-            state = step[0]
-            
-            # If this is the FIRST time seeing this state in this episode...
-            if state not in visited_states:
-                visited_states.add(state)
-                
-                # Update averages
-                returns_sum[state] += G
-                returns_count[state] += 1
-                V[state] = returns_sum[state] / returns_count[state]
-
-    return V
+        # B. Calculate Returns (G) and C. First-Visit Check
+        if profiler is None:
+            add_first_visit_returns(sum_flat, count_flat, episode)
+        else:
+            profiler.timed("update", add_first_visit_returns, sum_flat, count_flat, episode)
+
+def mc_prediction_replay(log_directory, first_visit=True):
+    """
+    MC prediction over episodes stored by episode_log, with no simulation.
+    Each chunk is one batch update (see batch_updates.py).
+    Returns (V, returns_count) as dense STATE_SHAPE arrays.
+    """
+    from episode_log import EpisodeReader
+
+    returns_sum = np.zeros(NUM_STATES)
+    returns_count = np.zeros(NUM_STATES, dtype=np.int64)
+    for chunk in EpisodeReader(log_directory).chunks():
+        sums, counts = batch_returns(chunk["states"], chunk["rewards"], chunk["offsets"],
+                                     NUM_STATES, first_visit)
+        returns_sum += sums
+        returns_count += counts
+
+    returns_sum = returns_sum.reshape(STATE_SHAPE)
+    returns_count = returns_count.reshape(STATE_SHAPE)
+    return compute_values(returns_sum, returns_count), returns_count
+
+def mc_prediction_vec(num_episodes, policy, n_envs=4096, batch_episodes=100_000,
+                      first_visit=True, seed=None):
+    """
+    MC prediction on a VecBlackjackEnv with batched updates.
+    policy is a function like simple_policy or an array of actions shaped
+    like STATE_SHAPE. Returns (V, returns_count) as dense STATE_SHAPE arrays.
+    """
+    from blackjack_dp import policy_table
+
+    actions = policy if isinstance(policy, np.ndarray) else policy_table(policy)
+    actions = actions.reshape(NUM_STATES)
+    collector = VecEpisodeCollector(VecBlackjackEnv(n_envs, seed=seed))
+
+    returns_sum = np.zeros(NUM_STATES)
+    returns_count = np.zeros(NUM_STATES, dtype=np.int64)
+    done = 0
+    while done < num_episodes:
+        batch = collector.collect(lambda codes: actions[codes],
+                                  min(batch_episodes, num_episodes - done))
+        sums, counts = batch_returns(batch["states"], batch["rewards"], batch["offsets"],
+                                     NUM_STATES, first_visit)
+        returns_sum += sums
+        returns_count += counts
+        done += len(batch["offsets"]) - 1
+
+    returns_sum = returns_sum.reshape(STATE_SHAPE)
+    returns_count = returns_count.reshape(STATE_SHAPE)
+    return compute_values(returns_sum, returns_count), returns_count
+
+def compute_values(returns_sum, returns_count):
+    """V = sum / count, done once at the end. Unvisited states are NaN."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(returns_count > 0, returns_sum / returns_count, np.nan)
+
+def values_to_dict(V):
+    """Dense V table -> {state: value} for every visited state."""
+    value_function = defaultdict(float)
+    for player_sum, dealer_card, usable_ace in zip(*np.nonzero(~np.isnan(V))):
+        state = (int(player_sum), int(dealer_card), bool(usable_ace))
+        value_function[state] = float(V[player_sum, dealer_card, usable_ace])
+    return value_function
+
+def mc_prediction(env, num_episodes, policy, checkpoint_dir=None, checkpoint_every=100_000,
+                  profiler=None):
+    # Sum of returns and count of visits for every state
+    returns_sum = np.zeros(STATE_SHAPE)
+    returns_count = np.zeros(STATE_SHAPE, dtype=np.int64)
+
+    # Pick up an interrupted run (see checkpoint.py)
+    done = 0
+    ckpt = Checkpoint(checkpoint_dir) if checkpoint_dir is not None else None
+    if ckpt is not None and ckpt.exists():
+        done, state = ckpt.load({"returns_sum": returns_sum, "returns_count": returns_count})
+        env.deck = state["deck"]
+        print(f"Resuming from checkpoint at episode {done}...")
+    print(f"Running MC Prediction for {num_episodes} episodes...")
+
+    # Without a checkpoint this is a single chunk
+    chunk = checkpoint_every if ckpt is not None else num_episodes
+    while done < num_episodes:
+        n = min(chunk, num_episodes - done)
+        accumulate_returns(env, policy, n, returns_sum, returns_count, profiler)
+        done += n
+        if profiler is not None:
+            profiler.log_progress(done)
+        if ckpt is not None:
+            ckpt.save(done, {"returns_sum": returns_sum, "returns_count": returns_count},
+                      state={"deck": env.deck})
+
+    # The Value Function (Average), computed once at the end
+    return values_to_dict(compute_values(returns_sum, returns_count))
+
+# 4. Sharded (Parallel) Prediction
+# The episodes are cut into fixed-size shards, each with its own seed from
+# the master seed. A shard returns partial (sum, count) arrays, and partials
+# merge by plain addition, so the result depends only on the master seed and
+# shard size, not on how many workers ran them.
+
+def _prediction_shard(args):
+    """Runs in a worker process. Returns the shard's (sum, count) arrays."""
+    policy, num_episodes, seed = args
+    seed_all(seed)  # Each shard gets its own child stream of the master seed
+
+    returns_sum = np.zeros(STATE_SHAPE)
+    returns_count = np.zeros(STATE_SHAPE, dtype=np.int64)
+    accumulate_returns(BlackjackEnv(), policy, num_episodes, returns_sum, returns_count)
+    return returns_sum, returns_count
+
+def mc_prediction_parallel(num_episodes, policy, n_workers=None,
+                           shard_size=100_000, seed=0):
+    """
+    First-visit MC prediction spread over a process pool.
+    policy must be a module-level function so it can be sent to workers.
+    Returns (V, returns_count) as dense STATE_SHAPE arrays.
+    """
+    n_shards = -(-num_episodes // shard_size)
+    shard_sizes = [shard_size] * (n_shards - 1) + [num_episodes - shard_size * (n_shards - 1)]
+    seeds = np.random.SeedSequence(seed).spawn(n_shards)
+
+    returns_sum = np.zeros(STATE_SHAPE)
+    returns_count = np.zeros(STATE_SHAPE, dtype=np.int64)
+    print(f"Running MC Prediction for {num_episodes} episodes in {n_shards} shards...")
+
+    with ProcessPoolExecutor(max_workers=n_workers or os.cpu_count()) as pool:
+        jobs = [(policy, size, shard_seed) for size, shard_seed in zip(shard_sizes, seeds)]
+        for shard_sum, shard_count in pool.map(_prediction_shard, jobs):
+            returns_sum += shard_sum
+            returns_count += shard_count
+
+    return compute_values(returns_sum, returns_count), returns_count
 
 # --- Main Execution ---
 if __name__ == "__main__":
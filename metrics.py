@@ -0,0 +1,132 @@
+import numpy as np
+
+class RewardRecorder:
+    """
+    Keeps learning-curve statistics in constant memory, however long we train.
+
+    - The last `window` rewards sit in a ring buffer (rolling mean / variance).
+    - The whole run has an online (Welford) mean and variance.
+    - The learning curve is stored downsampled: each point is the mean reward
+      of `bucket` episodes. When the curve fills up (max_points), neighbouring
+      points are averaged in pairs and the bucket size doubles.
+    """
+    def __init__(self, window=1000, max_points=2000):
+        self.window = window
+        self.recent = [0.0] * window   # Ring buffer of the latest rewards
+        self.pos = 0                   # Where the next reward goes
+        self.filled = 0                # How much of the ring is used
+        self.window_sum = 0.0
+        self.window_sq_sum = 0.0
+
+        # Whole run (Welford's online algorithm)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+        # Downsampled curve
+        self.max_points = max_points - max_points % 2
+        self.curve = np.zeros(self.max_points)
+        self.n_points = 0
+        self.bucket = 1
+        self._bucket_sum = 0.0
+        self._bucket_n = 0
+
+    def record(self, reward):
+        """Adds one episode's return."""
+        # Ring buffer: swap the oldest reward out of the window sums
+        old = self.recent[self.pos]
+        self.recent[self.pos] = reward
+        self.pos = (self.pos + 1) % self.window
+        if self.filled < self.window:
+            self.filled += 1
+            old = 0.0
+        self.window_sum += reward - old
+        self.window_sq_sum += reward * reward - old * old
+
+        # Welford update
+        self.count += 1
+        delta = reward - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (reward - self.mean)
+
+        # Curve
+        self._bucket_sum += reward
+        self._bucket_n += 1
+        if self._bucket_n == self.bucket:
+            self._push_point()
+
+    def record_batch(self, rewards):
+        """Adds many returns at once (e.g. from a worker process)."""
+        rewards = np.asarray(rewards, dtype=np.float64)
+        n = len(rewards)
+        if n == 0:
+            return
+
+        # Merge the batch's mean / variance into the running ones (Chan et al.)
+        batch_mean = rewards.mean()
+        batch_m2 = np.sum((rewards - batch_mean) ** 2)
+        delta = batch_mean - self.mean
+        total = self.count + n
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+        # Only the last `window` rewards can still be in the ring
+        for reward in rewards[-self.window:].tolist():
+            self.recent[self.pos] = reward
+            self.pos = (self.pos + 1) % self.window
+        self.filled = min(self.window, self.filled + n)
+        ring = np.array(self.recent[:self.filled])
+        self.window_sum = float(ring.sum())
+        self.window_sq_sum = float(np.sum(ring ** 2))
+
+        # Fill buckets a slice at a time
+        i = 0
+        while i < n:
+            take = min(self.bucket - self._bucket_n, n - i)
+            self._bucket_sum += float(rewards[i:i + take].sum())
+            self._bucket_n += take
+            i += take
+            if self._bucket_n == self.bucket:
+                self._push_point()
+
+    def _push_point(self):
+        self.curve[self.n_points] = self._bucket_sum / self.bucket
+        self.n_points += 1
+        self._bucket_sum = 0.0
+        self._bucket_n = 0
+        if self.n_points == self.max_points:
+            # Halve the resolution: average neighbouring points
+            half = self.max_points // 2
+            self.curve[:half] = (self.curve[0::2] + self.curve[1::2]) / 2
+            self.n_points = half
+            self.bucket *= 2
+
+    @property
+    def recent_mean(self):
+        """Mean of the last `window` rewards."""
+        return self.window_sum / self.filled if self.filled else 0.0
+
+    @property
+    def recent_var(self):
+        """Variance of the last `window` rewards."""
+        if not self.filled:
+            return 0.0
+        mean = self.recent_mean
+        return max(self.window_sq_sum / self.filled - mean * mean, 0.0)
+
+    @property
+    def var(self):
+        """Variance of every reward recorded so far."""
+        return self.m2 / self.count if self.count else 0.0
+
+    def curve_points(self):
+        """
+        Returns (episodes, mean_rewards) for plotting: the episode number at
+        the middle of each bucket and that bucket's mean reward.
+        """
+        episodes = (np.arange(self.n_points) + 0.5) * self.bucket
+        return episodes, self.curve[:self.n_points].copy()
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,100 @@
+import numpy as np
+from blackjack import NUM_STATES, STATE_SHAPE
+from episode_log import segment_suffix_sums
+
+# Off-policy Monte Carlo with weighted importance sampling.
+# Works on episodes stored by episode_log (flat columns + episode offsets),
+# so one pile of behaviour-policy episodes can score many target policies.
+# Everything is done on whole arrays: returns and importance weights come
+# from cumulative sums over the flattened episodes, never a per-step loop.
+#
+# Target policies are deterministic action tables shaped like STATE_SHAPE
+# (blackjack_dp.policy_table turns a policy function into one).
+
+def load_log(directory):
+    """All episodes in an episode_log directory as one set of columns."""
+    from episode_log import EpisodeReader
+    return EpisodeReader(directory).load()
+
+def returns(log):
+    """G_t for every step: the rewards from t to the end of its episode."""
+    return segment_suffix_sums(log["rewards"].astype(np.float64), log["offsets"])
+
+def importance_weights(log, targets, include_current=True):
+    """
+    Product of pi(a_k|s_k) / b(a_k|s_k) from step t (or t+1 when
+    include_current is False) to the end of the episode, for every step and
+    every target table. targets: (K,) + STATE_SHAPE. Returns shape (K, steps).
+    """
+    targets = np.asarray(targets).reshape(len(targets), NUM_STATES)
+    states = log["states"].astype(np.intp)
+    matches = targets[:, states] == log["actions"]
+
+    # Products become sums of logs; a zero ratio (target disagrees) is
+    # tracked as a count so it wipes out the whole product exactly.
+    probs = log["probs"].astype(np.float64)
+    log_ratio = np.where(matches, -np.log(probs), 0.0)
+    zeros = (~matches).astype(np.float64)
+    if not include_current:
+        # Drop step t itself: shift by subtracting its own term afterwards
+        log_sum = segment_suffix_sums(log_ratio, log["offsets"]) - log_ratio
+        zero_sum = segment_suffix_sums(zeros, log["offsets"]) - zeros
+    else:
+        log_sum = segment_suffix_sums(log_ratio, log["offsets"])
+        zero_sum = segment_suffix_sums(zeros, log["offsets"])
+    return np.where(zero_sum > 0.5, 0.0, np.exp(log_sum))
+
+def evaluate_policies(log, targets, batch_size=16):
+    """
+    Weighted importance sampling estimate of each target's expected return
+    (from the logged start states). Also returns the effective sample size,
+    a rough count of how many episodes actually back each estimate.
+    Returns (values, ess), both shape (K,).
+    """
+    targets = np.asarray(targets)
+    starts = log["offsets"][:-1]
+    G0 = returns(log)[starts]
+
+    values = np.zeros(len(targets))
+    ess = np.zeros(len(targets))
+    for lo in range(0, len(targets), batch_size):
+        W0 = importance_weights(log, targets[lo:lo + batch_size])[:, starts]
+        total = W0.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values[lo:lo + batch_size] = np.where(total > 0, (W0 @ G0) / total, np.nan)
+            ess[lo:lo + batch_size] = np.where(total > 0, total ** 2 / np.sum(W0 ** 2, axis=1), 0.0)
+    return values, ess
+
+def weighted_is_q(log, target):
+    """
+    Every-visit weighted importance sampling estimate of Q_pi for one target
+    table. Returns (Q, weight_sums), shaped like mc_control's Q table;
+    pairs with no weight stay at 0.
+    """
+    W = importance_weights(log, np.asarray(target)[None], include_current=False)[0]
+    G = returns(log)
+    pair = log["states"].astype(np.intp) * 2 + log["actions"]
+
+    numerator = np.bincount(pair, weights=W * G, minlength=NUM_STATES * 2)
+    weight_sums = np.bincount(pair, weights=W, minlength=NUM_STATES * 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        Q = np.where(weight_sums > 0, numerator / weight_sums, 0.0)
+    return Q.reshape(STATE_SHAPE + (2,)), weight_sums.reshape(STATE_SHAPE + (2,))
+
+def off_policy_control(log, initial_target=None, max_iters=50):
+    """
+    Off-policy MC control on a fixed batch of episodes: estimate Q for the
+    current greedy target with weighted IS, make the target greedy in Q,
+    and repeat until it stops changing. Returns (Q, target).
+    """
+    target = (np.zeros(STATE_SHAPE, dtype=np.int8) if initial_target is None
+              else np.asarray(initial_target, dtype=np.int8).copy())
+    for _ in range(max_iters):
+        Q, weight_sums = weighted_is_q(log, target)
+        # Only switch where both actions have data behind them
+        known = (weight_sums > 0).all(axis=-1)
+        new_target = np.where(known, np.argmax(Q, axis=-1), target).astype(np.int8)
+        if np.array_equal(new_target, target):
+            break
+        target = new_target
+    return Q, target
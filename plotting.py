@@ -0,0 +1,11 @@
+import matplotlib.pyplot as plt
+
+# Every plot in the project ends here: shown on screen, or with save_path
+# set written to that file and closed (for headless runs, e.g. experiments.py)
+
+def show_or_save(save_path=None):
+    if save_path is None:
+        plt.show()
+    else:
+        plt.savefig(save_path, dpi=120)
+        plt.close()
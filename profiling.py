@@ -0,0 +1,127 @@
+import csv
+import json
+import time
+import numpy as np
+from blackjack import NUM_STATES, encode_state
+
+class TrainingProfiler:
+    """
+    Optional instrumentation for mc_control / mc_predictions.
+
+    Pass one as `profiler=` to train_mc_control, mc_prediction or the
+    generate_episode functions. When no profiler is passed, the training
+    code takes its normal path and only pays for a None check per episode
+    (and one per stick, for the dealer timer inside BlackjackEnv).
+
+    Phases (seconds and call counts):
+      policy    choosing an action
+      env_step  env.step, including the dealer play-out
+      dealer    the dealer play-out on its own
+      update    the Q / returns update after an episode
+    """
+    PHASES = ("policy", "env_step", "dealer", "update")
+
+    def __init__(self):
+        self.phase_seconds = dict.fromkeys(self.PHASES, 0.0)
+        self.phase_calls = dict.fromkeys(self.PHASES, 0)
+        self.episode_lengths = [0] * 16   # episode_lengths[n] = episodes with n steps
+        self.state_visits = np.zeros(NUM_STATES, dtype=np.int64)
+        self.progress = []                # One row per progress log
+        self._start = time.perf_counter()
+        self._last_log = (0, self._start)
+
+    def add(self, phase, seconds):
+        self.phase_seconds[phase] += seconds
+        self.phase_calls[phase] += 1
+
+    def timed(self, phase, func, *args):
+        """Calls func(*args), charging the time to `phase`."""
+        start = time.perf_counter()
+        result = func(*args)
+        self.add(phase, time.perf_counter() - start)
+        return result
+
+    def play_episode(self, env, policy):
+        """
+        The generate_episode loop with a timer around each phase.
+        Also hooks the env's dealer timer up to this profiler, for this
+        episode only.
+        """
+        env.profiler = self
+        try:
+            clock = time.perf_counter
+            episode = []
+            state = env.reset()
+            done = False
+            while not done:
+                t0 = clock()
+                action = policy(state)
+                t1 = clock()
+                next_state, reward, done = env.step(action)
+                t2 = clock()
+                self.add("policy", t1 - t0)
+                self.add("env_step", t2 - t1)
+                episode.append((state, action, reward))
+                state = next_state
+        finally:
+            env.profiler = None
+        self.record_episode(episode)
+        return episode
+
+    def record_episode(self, episode):
+        """Episode length histogram and (every-visit) state visit counts."""
+        n = len(episode)
+        if n >= len(self.episode_lengths):
+            self.episode_lengths.extend([0] * (n + 1 - len(self.episode_lengths)))
+        self.episode_lengths[n] += 1
+        for state, _, _ in episode:
+            self.state_visits[encode_state(state)] += 1
+
+    def log_progress(self, episode):
+        """Records episodes/sec since the previous log. Returns that rate."""
+        now = time.perf_counter()
+        last_episode, last_time = self._last_log
+        rate = (episode - last_episode) / max(now - last_time, 1e-12)
+        self.progress.append({"episode": episode, "elapsed": now - self._start,
+                              "episodes_per_sec": rate})
+        self._last_log = (episode, now)
+        return rate
+
+    def summary(self):
+        return {
+            "phases": {phase: {"seconds": self.phase_seconds[phase],
+                               "calls": self.phase_calls[phase]}
+                       for phase in self.PHASES},
+            "episode_lengths": {n: count for n, count in enumerate(self.episode_lengths) if count},
+            "state_visits": {int(s): int(c) for s, c in enumerate(self.state_visits) if c},
+            "progress": self.progress,
+        }
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def to_csv(self, path):
+        """Long format: one (section, key, value) row per number."""
+        summary = self.summary()
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["section", "key", "value"])
+            for phase, stats in summary["phases"].items():
+                writer.writerow(["phase_seconds", phase, stats["seconds"]])
+                writer.writerow(["phase_calls", phase, stats["calls"]])
+            for n, count in summary["episode_lengths"].items():
+                writer.writerow(["episode_length", n, count])
+            for state, count in summary["state_visits"].items():
+                writer.writerow(["state_visits", state, count])
+            for row in summary["progress"]:
+                writer.writerow(["episodes_per_sec", row["episode"], row["episodes_per_sec"]])
+
+    def report(self):
+        """Prints where the time went."""
+        total = sum(self.phase_seconds[p] for p in ("policy", "env_step", "update"))
+        print("Phase    | Seconds  | Calls      | Share")
+        for phase in self.PHASES:
+            seconds = self.phase_seconds[phase]
+            share = seconds / total * 100 if total else 0.0
+            print(f"{phase:8s} | {seconds:8.3f} | {self.phase_calls[phase]:10d} | {share:5.1f}%")
@@ -0,0 +1,80 @@
+import numpy as np
+
+# One source of randomness for the whole project.
+# Asking NumPy for a single random number (np.random.random(),
+# np.random.choice([0, 1])) costs far more than the number itself, so the
+# stream draws big blocks up front and hands the numbers out one at a time.
+# Bulk users (the MonteCarlo estimators) take arrays straight from
+# `.generator`. Everything is reproducible from one seed, and spawn() gives
+# independent child streams for worker processes.
+
+class RandomStream:
+    def __init__(self, seed=None, block_size=65_536):
+        self.block_size = block_size
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        """Starts over from `seed` (an int, a SeedSequence or None)."""
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_seq = seed
+        self.generator = np.random.Generator(np.random.PCG64(seed))
+        # Empty blocks: the first call fills them
+        self._uniforms = []
+        self._u_pos = 0
+        self._coins = []
+        self._c_pos = 0
+
+    def random(self):
+        """One uniform float in [0, 1)."""
+        pos = self._u_pos
+        if pos == len(self._uniforms):
+            self._uniforms = self.generator.random(self.block_size).tolist()
+            pos = 0
+        self._u_pos = pos + 1
+        return self._uniforms[pos]
+
+    def coin(self):
+        """One fair 0 / 1 (e.g. a random action)."""
+        pos = self._c_pos
+        if pos == len(self._coins):
+            self._coins = self.generator.integers(0, 2, self.block_size).tolist()
+            pos = 0
+        self._c_pos = pos + 1
+        return self._coins[pos]
+
+    def spawn(self, n):
+        """n independent child streams (one per worker process)."""
+        return [RandomStream(child, self.block_size) for child in self.seed_seq.spawn(n)]
+
+    def get_state(self):
+        """Everything needed to carry on exactly where we are (for checkpoints)."""
+        return {
+            "bit_generator": self.generator.bit_generator.state,
+            "uniforms": self._uniforms[self._u_pos:],
+            "coins": self._coins[self._c_pos:],
+        }
+
+    def set_state(self, state):
+        self.generator.bit_generator.state = state["bit_generator"]
+        self._uniforms, self._u_pos = list(state["uniforms"]), 0
+        self._coins, self._c_pos = list(state["coins"]), 0
+
+    def __reduce_ex__(self, protocol):
+        # A pickled reference to the shared stream (e.g. inside a Deck in a
+        # checkpoint) comes back as the shared stream, not a detached copy
+        if self is DEFAULT:
+            return (_shared_stream, ())
+        return super().__reduce_ex__(protocol)
+
+# The shared stream. Modules keep a reference to this object, so reseed it
+# in place (seed_all) rather than replacing it.
+DEFAULT = RandomStream()
+
+def _shared_stream():
+    return DEFAULT
+
+def seed_all(seed):
+    """Makes every user of the shared stream reproducible from `seed`."""
+    DEFAULT.reseed(seed)
+    return DEFAULT
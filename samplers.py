@@ -0,0 +1,75 @@
+import warnings
+import numpy as np
+from scipy.stats import qmc
+
+# Ways to place points in the unit square for the hit-or-miss estimators.
+# Plain uniform sampling converges like 1/sqrt(N); the others spread the
+# points out more evenly, so the same accuracy takes far fewer samples.
+#
+# A sampler is made once per run: make_sampler(name, gen) returns
+# draw(n) -> (2, n) array in [0, 1), and run_simulation scales the rows
+# to its bounds. Every design is randomised (fresh strata offsets, fresh
+# permutations, scrambled sequences), so repeating a run with another seed
+# gives an independent replicate -- that's where the error bars come from.
+
+def _uniform(gen):
+    def draw(n):
+        return gen.random((2, n))
+    return draw
+
+def _stratified(gen):
+    # k x k grid of equal cells, one random point per cell; the few points
+    # left over (n - k^2) are plain uniform
+    def draw(n):
+        k = int(np.sqrt(n))
+        cells = np.arange(k * k)
+        pts = np.empty((2, n))
+        pts[0, :k * k] = (cells // k + gen.random(k * k)) / k
+        pts[1, :k * k] = (cells % k + gen.random(k * k)) / k
+        pts[:, k * k:] = gen.random((2, n - k * k))
+        return pts
+    return draw
+
+def _antithetic(gen):
+    # Every point u comes with its mirror image 1 - u
+    def draw(n):
+        half = gen.random((2, n // 2))
+        return np.hstack([half, 1 - half, gen.random((2, n % 2))])
+    return draw
+
+def _latin_hypercube(gen):
+    # Each coordinate hits every one of the n equal slices exactly once
+    def draw(n):
+        pts = np.empty((2, n))
+        for row in pts:
+            row[:] = (gen.permutation(n) + gen.random(n)) / n
+        return pts
+    return draw
+
+def _qmc(engine_class):
+    # One scrambled low-discrepancy sequence per run; chunks carry on where
+    # the previous chunk stopped, so the whole run is one sequence
+    def make(gen):
+        engine = engine_class(d=2, scramble=True, seed=gen)
+        def draw(n):
+            with warnings.catch_warnings():
+                # Sobol prefers powers of 2; any n is still a valid sample
+                warnings.simplefilter("ignore", UserWarning)
+                return engine.random(n).T
+        return draw
+    return make
+
+SAMPLERS = {
+    "uniform": _uniform,
+    "stratified": _stratified,
+    "antithetic": _antithetic,
+    "lhs": _latin_hypercube,
+    "sobol": _qmc(qmc.Sobol),
+    "halton": _qmc(qmc.Halton),
+}
+
+def make_sampler(name, gen):
+    """draw(n) -> (2, n) points in [0, 1) for sampler `name`, using Generator `gen`."""
+    if name not in SAMPLERS:
+        raise ValueError(f"Unknown sampler {name!r}; choose from {sorted(SAMPLERS)}")
+    return SAMPLERS[name](gen)
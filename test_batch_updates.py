@@ -0,0 +1,44 @@
+import numpy as np
+from batch_updates import VecEpisodeCollector, first_visit_mask
+from blackjack import VecBlackjackEnv
+
+# Regression checks for the batched episode path:
+#   python -m pytest test_batch_updates.py   (or python test_batch_updates.py)
+
+def stick_on_17(codes):
+    return (codes // 24 < 17).astype(np.int8)  # code // (DEALER_CARDS * 2) = player sum
+
+def test_collect_returns_exactly_n_episodes():
+    # Few games, so most calls cut through games and carry episodes over
+    collector = VecEpisodeCollector(VecBlackjackEnv(8, seed=0))
+    rng = np.random.default_rng(0)
+    for n in list(rng.integers(1, 40, 50)) + [1, 1, 200, 3]:
+        batch = collector.collect(stick_on_17, int(n))
+        offsets = batch["offsets"]
+        assert len(offsets) - 1 == n
+        assert offsets[-1] == len(batch["states"]) == len(batch["actions"]) == len(batch["rewards"])
+        assert np.all(np.diff(offsets) > 0)
+
+def _first_visit_mask_loop(codes, offsets):
+    """The original per-episode set logic."""
+    mask = np.zeros(len(codes), dtype=bool)
+    for start, stop in zip(offsets[:-1], offsets[1:]):
+        seen = set()
+        for t in range(start, stop):
+            if codes[t] not in seen:
+                seen.add(codes[t])
+                mask[t] = True
+    return mask
+
+def test_first_visit_mask_matches_set_logic():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        lengths = rng.integers(1, 8, rng.integers(1, 30))
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        codes = rng.integers(0, rng.integers(1, 10), offsets[-1])
+        assert np.array_equal(first_visit_mask(codes, offsets), _first_visit_mask_loop(codes, offsets))
+
+if __name__ == "__main__":
+    test_collect_returns_exactly_n_episodes()
+    test_first_visit_mask_matches_set_logic()
+    print("ok")